@@ -3,15 +3,29 @@
 VIBRAトレンド分析モジュール
 共起語抽出とクラスタリング
 """
+import re
 from janome.tokenizer import Tokenizer
 from collections import Counter
 import networkx as nx
 import community.community_louvain as community_louvain
-from typing import List, Dict
+from typing import List, Dict, NamedTuple
 
+import config
 from models import RawTrendItem, AnalyzedTrendItem
 
 
+# Janomeの辞書ロードは重いため、プロセスごとに1回だけ生成して使い回す
+_tokenizer = None
+
+
+def _get_tokenizer() -> Tokenizer:
+    """プロセス内で共有するTokenizerを返す"""
+    global _tokenizer
+    if _tokenizer is None:
+        _tokenizer = Tokenizer()
+    return _tokenizer
+
+
 def analyze_trends(raw_trends: List[RawTrendItem]) -> List[AnalyzedTrendItem]:
     """
     生トレンドデータを分析し、共起語とクラスタIDを付与する。
@@ -24,8 +38,9 @@ def analyze_trends(raw_trends: List[RawTrendItem]) -> List[AnalyzedTrendItem]:
     """
     print(f"[INFO][analyzer] Analyzing {len(raw_trends)} trends...")
     
-    # 1. 共起語抽出
-    trends_with_cowords = _extract_co_occurring_words(raw_trends)
+    # 1. 形態素解析（文単位）と共起語抽出
+    tokenized = _tokenize_trends(raw_trends)
+    trends_with_cowords = _extract_co_occurring_words(raw_trends, tokenized)
     
     # 2. クラスタリング
     cluster_mapping = _detect_clusters(trends_with_cowords)
@@ -33,7 +48,7 @@ def analyze_trends(raw_trends: List[RawTrendItem]) -> List[AnalyzedTrendItem]:
     # 3. AnalyzedTrendItemを生成
     analyzed_items: List[AnalyzedTrendItem] = []
     
-    for trend, co_words in trends_with_cowords:
+    for (trend, co_words), tokens in zip(trends_with_cowords, tokenized):
         cluster_id = cluster_mapping.get(trend.title, 0)
         
         analyzed_items.append(AnalyzedTrendItem(
@@ -42,15 +57,82 @@ def analyze_trends(raw_trends: List[RawTrendItem]) -> List[AnalyzedTrendItem]:
             detail_url=trend.detail_url,
             related_posts=trend.related_posts,
             co_occurring_words=co_words,
-            cluster_id=cluster_id
+            cluster_id=cluster_id,
+            sentences=tokens.sentences,
+            sentence_tokens=tokens.sentence_tokens,
+            nouns=tokens.title_nouns + tokens.nouns
         ))
     
     print(f"[INFO][analyzer] Analysis complete. {len(analyzed_items)} items processed.")
     return analyzed_items
 
 
+class _TokenizedPosts(NamedTuple):
+    """1トレンド分の関連投稿の形態素解析結果"""
+    sentences: List[str]             # 文単位に分割した投稿
+    sentence_tokens: List[List[str]] # 各文の内容語（名詞・動詞・形容詞の基本形）
+    nouns: List[str]                 # 共起語候補の名詞（一般・固有名詞）
+    title_nouns: List[str]           # タイトル中の名詞（急上昇ワード集計用。全トレンド分）
+
+
+def _tokenize_trends(raw_trends: List[RawTrendItem]) -> List[_TokenizedPosts]:
+    """
+    各トレンドの関連投稿を文単位で1回だけ形態素解析する。
+    結果は共起語抽出と要約（summarizer）の両方で使い回す。
+    タイトルは全トレンド分を解析する（急上昇ワード集計は一覧の全件を対象にするため）。
+    """
+    t = _get_tokenizer()
+    results = []
+    
+    for i, trend in enumerate(raw_trends):
+        sentences: List[str] = []
+        sentence_tokens: List[List[str]] = []
+        nouns: List[str] = []
+        
+        # 上位 ANALYZE_TREND_COUNT 件のみ詳細分析（関連投稿もこの件数しか取得していない）
+        if i < config.ANALYZE_TREND_COUNT and trend.related_posts:
+            for sentence in _split_sentences(trend.related_posts):
+                content_words = []
+                for token in t.tokenize(sentence):
+                    part_of_speech = token.part_of_speech.split(',')
+                    if part_of_speech[0] == '名詞' and part_of_speech[1] in ['一般', '固有名詞']:
+                        # トレンドキーワード自体は除外
+                        if token.surface != trend.title:
+                            nouns.append(token.surface)
+                        content_words.append(token.surface)
+                    elif part_of_speech[0] == '名詞' and part_of_speech[1] == 'サ変接続':
+                        content_words.append(token.surface)
+                    elif part_of_speech[0] in ['動詞', '形容詞'] and part_of_speech[1] == '自立':
+                        content_words.append(token.base_form)
+                sentences.append(sentence)
+                sentence_tokens.append(content_words)
+        
+        title_nouns = [
+            token.surface for token in t.tokenize(trend.title)
+            if token.part_of_speech.split(',')[:2] in (['名詞', '一般'], ['名詞', '固有名詞'])
+        ]
+        
+        results.append(_TokenizedPosts(sentences, sentence_tokens, nouns, title_nouns))
+    
+    return results
+
+
+def _split_sentences(posts: List[str]) -> List[str]:
+    """投稿を句点・感嘆符・改行で文に分割する（重複文は除く）"""
+    sentences: List[str] = []
+    seen = set()
+    for post in posts:
+        for sentence in re.split(r'(?<=[。．！？!?])|\n', post):
+            sentence = sentence.strip()
+            if sentence and sentence not in seen:
+                seen.add(sentence)
+                sentences.append(sentence)
+    return sentences
+
+
 def _extract_co_occurring_words(
-    raw_trends: List[RawTrendItem]
+    raw_trends: List[RawTrendItem],
+    tokenized: List[_TokenizedPosts]
 ) -> List[tuple[RawTrendItem, List[str]]]:
     """
     各トレンドの関連投稿から共起名詞を抽出する。
@@ -58,29 +140,12 @@ def _extract_co_occurring_words(
     Returns:
         List[(RawTrendItem, List[str])]: トレンドと共起語のタプルリスト
     """
-    t = Tokenizer()
     results = []
     
-    for i, trend in enumerate(raw_trends):
-        co_words = []
-        
-        # 上位5件のみ詳細分析
-        if i < 5 and trend.related_posts:
-            all_text = " ".join(trend.related_posts)
-            tokens = t.tokenize(all_text)
-            nouns = []
-            
-            for token in tokens:
-                part_of_speech = token.part_of_speech.split(',')
-                if part_of_speech[0] == '名詞' and part_of_speech[1] in ['一般', '固有名詞']:
-                    # トレンドキーワード自体は除外
-                    if token.surface != trend.title:
-                        nouns.append(token.surface)
-            
-            # 出現頻度でソートし上位3件を取得
-            counter = Counter(nouns)
-            co_words = [word for word, _ in counter.most_common(3)]
-        
+    for trend, tokens in zip(raw_trends, tokenized):
+        # 出現頻度でソートし上位3件を取得
+        counter = Counter(tokens.nouns)
+        co_words = [word for word, _ in counter.most_common(3)]
         results.append((trend, co_words))
     
     return results
@@ -0,0 +1,234 @@
+# scripts/archive_builder.py
+"""
+VIBRAアーカイブビルダー
+毎サイクルのトレンドを時間別・日別の静的ページとして蓄積し、
+ブラウザで検索できる文字バイグラムの全文検索インデックスを増分更新する。
+
+永続化先（デプロイごとにdistは作り直されるため、cache側に保持する）:
+  {ARCHIVE_DIR}/entries/YYYY-MM-DD.json   日ごとの元データ（時間別スナップショット + 検索ドキュメント）
+  {ARCHIVE_DIR}/site/archive/...           生成済みページ
+  {ARCHIVE_DIR}/site/search/meta.json      インデックス設定（シャード数、月ごとの版）
+  {ARCHIVE_DIR}/site/search/docs/YYYY-MM-DD.json   検索ドキュメント [title, summary, words, hours]
+  {ARCHIVE_DIR}/site/search/index/YYYY-MM/XX.json  バイグラム → ドキュメントID のポスティング
+                                                    （月で分割し、さらにハッシュでシャード分割）
+
+各サイクルで書き換えるのは、当日の元データ・ページ・ドキュメントと、
+当月のうち新規/変更ドキュメントの新旧バイグラムが属するシャードのみ。
+変更ドキュメントの古いポスティングはその際に取り除くため、シャードに不要なエントリは溜まらない。
+シャードは月ごとに閉じるので、1つのシャードの大きさは1か月分で頭打ちになる。
+"""
+import os
+import re
+import json
+import time
+import shutil
+import unicodedata
+from datetime import datetime
+from typing import Dict, Iterable, List, Set
+
+from jinja2 import Environment
+
+import config
+from models import EnrichedTrendItem
+
+
+def update_archive(
+    trends: List[EnrichedTrendItem],
+    env: Environment,
+    now: datetime,
+    archive_dir: str = config.ARCHIVE_DIR
+) -> str:
+    """
+    今回のトレンドをアーカイブに反映する。
+
+    Returns:
+        str: 配信用ファイルのルート（distへそのままコピーする）
+    """
+    site_dir = os.path.join(archive_dir, 'site')
+    day = now.strftime('%Y-%m-%d')
+    hour = now.strftime('%H')
+
+    # 1. 当日の元データを更新（同じ時間帯は最新のスナップショットで上書き）
+    entries = _load_json(os.path.join(archive_dir, 'entries', f'{day}.json'), {"hours": {}, "docs": []})
+    snapshot = [
+        {
+            "title": t.title,
+            "score": t.score,
+            "category": t.category,
+            "summary": t.summary,
+            "words": list(t.co_occurring_words),
+        }
+        for t in trends
+    ]
+    entries["hours"][hour] = snapshot
+
+    # 2. 検索ドキュメント（1日 × 1タイトル = 1ドキュメント）を更新し、変化したものを記録
+    docs: List[List] = entries["docs"]
+    doc_index = {_normalize(doc[0]): i for i, doc in enumerate(docs)}
+    changed: Set[int] = set()
+    previous_grams: Set[str] = set()  # 変更ドキュメントの変更前のバイグラム（古いポスティングの除去用）
+    for item in snapshot:
+        key = _normalize(item["title"])
+        if key not in doc_index:
+            doc_index[key] = len(docs)
+            docs.append([item["title"], item["summary"], item["words"], []])
+            changed.add(doc_index[key])
+        doc = docs[doc_index[key]]
+        if doc[1] != item["summary"] or doc[2] != item["words"]:
+            previous_grams |= _doc_bigrams(doc)
+            doc[1], doc[2] = item["summary"], item["words"]
+            changed.add(doc_index[key])
+        if hour not in doc[3]:
+            doc[3].append(hour)
+            doc[3].sort()
+
+    _write_json(os.path.join(archive_dir, 'entries', f'{day}.json'), entries)
+    _write_json(os.path.join(site_dir, 'search', 'docs', f'{day}.json'), docs)
+
+    # 3. 変化したドキュメントのポスティングだけ、当月の該当シャードで差し替える
+    updated_shards = _update_index(site_dir, archive_dir, day, docs, changed, previous_grams)
+
+    # 4. ページ生成（今回の時間帯・当日・一覧のみ）
+    _render(env, 'archive_hour.html', os.path.join(site_dir, 'archive', day, f'{hour}.html'),
+            day=day, hour=hour, trends=snapshot)
+    _render(env, 'archive_day.html', os.path.join(site_dir, 'archive', day, 'index.html'),
+            day=day, hours=sorted(entries["hours"]), docs=docs)
+    days = sorted((name[:-5] for name in os.listdir(os.path.join(archive_dir, 'entries')) if name.endswith('.json')),
+                  reverse=True)
+    _render(env, 'archive_index.html', os.path.join(site_dir, 'archive', 'index.html'),
+            days=days, search_version=int(time.time()))
+
+    print(f"[INFO][archive] Archived {len(snapshot)} trends for {day} {hour}:00 "
+          f"({len(changed)} new/changed docs, {updated_shards} index shards updated).")
+    return site_dir
+
+
+def _update_index(
+    site_dir: str,
+    archive_dir: str,
+    day: str,
+    docs: List[List],
+    changed: Set[int],
+    previous_grams: Set[str]
+) -> int:
+    """変更ドキュメントのポスティングを当月のシャードで差し替え、更新したシャード数を返す"""
+    index_dir = os.path.join(site_dir, 'search', 'index')
+    meta_path = os.path.join(site_dir, 'search', 'meta.json')
+    month = day[:7]
+    version = int(time.time())
+
+    meta = _load_json(meta_path, {})
+    if meta.get("shards") != config.SEARCH_INDEX_SHARDS or "months" not in meta:
+        # シャード数・配置が変わると既存のシャードと互換がないため、全日分から作り直す
+        print(f"[INFO][archive] Building search index with {config.SEARCH_INDEX_SHARDS} shards...")
+        shutil.rmtree(index_dir, ignore_errors=True)
+        postings_by_month: Dict[str, Dict[str, Dict[str, Set[str]]]] = {}
+        entries_dir = os.path.join(archive_dir, 'entries')
+        for name in sorted(os.listdir(entries_dir)):
+            other_day = name[:-5]
+            other_docs = docs if other_day == day else _load_json(os.path.join(entries_dir, name), {"docs": []})["docs"]
+            _collect_postings(postings_by_month.setdefault(other_day[:7], {}), other_day, other_docs,
+                              range(len(other_docs)))
+        for other_month, postings_by_shard in postings_by_month.items():
+            for shard, postings in postings_by_shard.items():
+                _write_json(os.path.join(index_dir, other_month, f'{shard}.json'),
+                            {gram: sorted(doc_ids) for gram, doc_ids in postings.items()})
+        _write_json(meta_path, {"shards": config.SEARCH_INDEX_SHARDS,
+                                "months": {m: version for m in postings_by_month}})
+        return sum(len(postings_by_shard) for postings_by_shard in postings_by_month.values())
+
+    postings_by_shard: Dict[str, Dict[str, Set[str]]] = {}
+    _collect_postings(postings_by_shard, day, docs, changed)
+    touched = set(postings_by_shard) | {_shard_name(gram) for gram in previous_grams}
+    changed_ids = {f'{day}:{i}' for i in changed}
+
+    for shard in touched:
+        path = os.path.join(index_dir, month, f'{shard}.json')
+        index = _load_json(path, {})
+        # 変更ドキュメントの古いポスティングを除いてから、新しいものを入れる
+        for gram in list(index):
+            doc_ids = [doc_id for doc_id in index[gram] if doc_id not in changed_ids]
+            if doc_ids:
+                index[gram] = doc_ids
+            else:
+                del index[gram]
+        for gram, doc_ids in postings_by_shard.get(shard, {}).items():
+            index[gram] = sorted(set(index.get(gram, [])) | doc_ids)
+        _write_json(path, index)
+
+    if touched:
+        # ブラウザは月ごとの版をシャードのURLに付けるので、変更のない月はキャッシュが効き続ける
+        meta["months"][month] = version
+        _write_json(meta_path, meta)
+    return len(touched)
+
+
+def _collect_postings(
+    postings_by_shard: Dict[str, Dict[str, Set[str]]],
+    day: str,
+    docs: List[List],
+    indices: Iterable[int]
+) -> None:
+    """指定ドキュメントのバイグラムをシャードごとに集める（ドキュメントID = 'YYYY-MM-DD:番号'）"""
+    for i in indices:
+        doc_id = f'{day}:{i}'
+        for gram in _doc_bigrams(docs[i]):
+            postings_by_shard.setdefault(_shard_name(gram), {}).setdefault(gram, set()).add(doc_id)
+
+
+def _doc_bigrams(doc: List) -> Set[str]:
+    """検索ドキュメント [title, summary, words, hours] の索引対象バイグラム"""
+    title, summary, words, _ = doc
+    return _bigrams(' '.join([title, summary] + list(words)))
+
+
+def _normalize(text: str) -> str:
+    """検索用の正規化（全角半角・大小文字の揺れを吸収）。static/js/search.js と揃えること"""
+    return unicodedata.normalize('NFKC', text or '').lower()
+
+
+def _bigrams(text: str) -> Set[str]:
+    """
+    文字バイグラムを返す。記号・空白で区切った区間ごとに作り、
+    1文字だけの区間はその文字自体をトークンとする。
+    """
+    grams: Set[str] = set()
+    for segment in re.findall(r'\w+', _normalize(text)):
+        if len(segment) == 1:
+            grams.add(segment)
+        else:
+            grams.update(segment[i:i + 2] for i in range(len(segment) - 1))
+    return grams
+
+
+def _shard_name(gram: str) -> str:
+    """
+    バイグラムの格納シャード名。ブラウザ側でも同じ計算ができるよう、
+    UTF-16コード単位に対するFNV-1a (32bit) を使う。
+    """
+    h = 0x811c9dc5
+    data = gram.encode('utf-16-le')
+    for i in range(0, len(data), 2):
+        h ^= data[i] | (data[i + 1] << 8)
+        h = (h * 0x01000193) & 0xffffffff
+    return format(h % config.SEARCH_INDEX_SHARDS, '02x')
+
+
+def _render(env: Environment, template_name: str, path: str, **context) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(env.get_template(template_name).render(**context))
+
+
+def _load_json(path: str, default):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return default
+
+
+def _write_json(path: str, data) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
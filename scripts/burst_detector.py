@@ -0,0 +1,116 @@
+# scripts/burst_detector.py
+"""
+VIBRAバースト検出モジュール
+トレンドごとの投稿数を、時間間隔を考慮したEWMA（指数加重移動平均・分散）で追跡し、
+z-scoreとヒステリシス付きの状態遷移で「急上昇中（burst）」を判定する。
+
+- トレンドごとの状態は数値4つだけで、1サイクルの更新はO(1)。履歴の再走査はしない。
+- 状態は実行間でキャッシュに保存する（{BURST_STATE_PATH}）。
+"""
+import os
+import json
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Tuple
+
+import config
+
+
+BURST = 'burst'      # 急上昇中
+STEADY = 'steady'    # 平常
+COOLING = 'cooling'  # 下降中
+
+
+@dataclass
+class BurstState:
+    """1トレンド分の検出器の状態"""
+    mean: float       # log1p(投稿数) のEWMA
+    var: float        # 同EWMA分散
+    bursting: bool    # 現在バースト状態か（ヒステリシス用）
+    last_seen: float  # 最終更新時刻（UNIX秒）
+
+
+def update(
+    states: Dict[str, BurstState],
+    title: str,
+    posts_num: int,
+    observed_at: datetime,
+    rank: int,
+    cold_start: bool = False
+) -> Tuple[str, float]:
+    """
+    1トレンドの観測値で状態を更新し、(バースト状態, バースト強度) を返す。
+    バースト強度は正のz-score（平常からの上振れの大きさ）。
+
+    Args:
+        rank: 今回の一覧での順位（0始まり）。初登場トレンドの判定に使う
+        cold_start: 保存済みの状態がない（初回実行・状態ファイルの欠損）場合True。
+            このときは全トレンドが初登場に見えるため、初登場をバーストとみなさない
+    """
+    x = math.log1p(posts_num)
+    now = observed_at.timestamp()
+    state = states.get(title)
+
+    if state is None:
+        # 上位に突然現れたトレンドは、そのこと自体を急上昇とみなす
+        bursting = not cold_start and rank < config.BURST_NEW_TREND_MAX_RANK
+        states[title] = BurstState(mean=x, var=config.BURST_PRIOR_VAR, bursting=bursting, last_seen=now)
+        if bursting:
+            return BURST, config.BURST_NEW_TREND_Z
+        return STEADY, 0.0
+
+    z = (x - state.mean) / math.sqrt(state.var + config.BURST_VAR_FLOOR)
+
+    # ヒステリシス: 入るときは高い閾値、抜けるときは低い閾値
+    if state.bursting:
+        state.bursting = z >= config.BURST_EXIT_Z
+    else:
+        state.bursting = z >= config.BURST_ENTER_Z
+
+    # 観測間隔に応じた平滑化係数（間隔が空くほど新しい値を重く見る）
+    elapsed_minutes = max(0.0, now - state.last_seen) / 60
+    alpha = 1 - math.exp(-elapsed_minutes / config.BURST_EWMA_TAU_MINUTES)
+    diff = x - state.mean
+    increment = alpha * diff
+    state.mean += increment
+    state.var = (1 - alpha) * (state.var + diff * increment)
+    state.last_seen = now
+
+    if state.bursting:
+        label = BURST
+    elif z <= config.BURST_COOLING_Z:
+        label = COOLING
+    else:
+        label = STEADY
+    return label, round(max(0.0, z), 2)
+
+
+def load_states(path: str = config.BURST_STATE_PATH) -> Dict[str, BurstState]:
+    """保存済みの状態を読み込む"""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            raw = json.load(f)
+        return {title: BurstState(mean, var, bool(bursting), last_seen)
+                for title, (mean, var, bursting, last_seen) in raw.items()}
+    except (json.JSONDecodeError, ValueError, TypeError):
+        return {}
+
+
+def save_states(
+    states: Dict[str, BurstState],
+    now: datetime,
+    path: str = config.BURST_STATE_PATH
+) -> None:
+    """状態を保存する。長期間観測されていないトレンドは捨てる"""
+    expire_before = now.timestamp() - config.BURST_STATE_TTL_HOURS * 3600
+    raw = {
+        title: [round(s.mean, 4), round(s.var, 4), int(s.bursting), round(s.last_seen)]
+        for title, s in states.items()
+        if s.last_seen >= expire_before
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(raw, f, ensure_ascii=False, separators=(',', ':'))
@@ -34,21 +34,84 @@ DETAIL_URL_SELECTOR = "a" # 親要素の中の最初のaタグ
 # (これは別途、詳細ページのHTMLを調査して確定させる必要があるが、一旦推測値を入れておく)
 POST_TEXT_SELECTOR = "p[class*='Post_body__']"
 
+# 4. 取得元ソース一覧（先頭ほど優先度が高く、重複時のタイトル・URLに採用される）
+# backend: 'selenium'（JSレンダリングが必要なページ） / 'requests'（静的HTML）
+TREND_SOURCES = [
+    {
+        "name": "yahoo_realtime_matome",
+        "url": DATA_SOURCE_URL,
+        "backend": "selenium",
+        "base_url": "https://search.yahoo.co.jp",
+        "item_selector": TREND_SELECTORS[0],
+        "title_selector": TITLE_SELECTOR,
+        "posts_count_selector": POSTS_COUNT_SELECTOR,
+        "detail_url_selector": DETAIL_URL_SELECTOR,
+        "post_text_selector": POST_TEXT_SELECTOR,
+    },
+]
+
+# 1サイクルの取得期限（全ソース共通）。期限を過ぎたソースは残りのURLを今回のサイクルでは諦める
+SOURCE_FETCH_TIMEOUT_SECONDS = 120
+# 期限を守らずに戻らないソース（ドライバ起動のハングなど）を見切るまでの猶予
+SOURCE_FETCH_GRACE_SECONDS = 10
+# ソース間の順位統合 (Reciprocal Rank Fusion) の平滑化定数
+SOURCE_MERGE_RRF_K = 60
+
+# ================================================
+# 実行スケジュール設定 (Scheduler用)
+# ================================================
+SCHEDULER_STATE_PATH = "cache/scheduler_state.json"
+SCHEDULER_MIN_INTERVAL_MINUTES = 5    # 変化が激しいときの最短間隔（cronはこの間隔で起動する）
+SCHEDULER_MAX_INTERVAL_MINUTES = 60   # 変化がないときの最長間隔
+SCHEDULER_CHURN_FOR_MIN_INTERVAL = 0.5  # このチャーン率(0-1)以上で最短間隔になる
+SCHEDULER_CHURN_SMOOTHING = 0.5       # チャーン率のEWMA係数（大きいほど直近の変化に敏感）
+SCHEDULER_POSTS_RESOLUTION = 0.05     # 投稿数はこの相対変化未満を「変化なし」とみなす
+
 # ================================================
 # テキストマイニング設定 (Analyzer用)
 # ================================================
 CO_OCCURRING_WORD_COUNT = 3
 
+# 急上昇ワード（実行をまたいだ名詞の近似頻度）
+TERM_TRACKER_PATH = "cache/term_tracker.json"
+EMERGING_WORDS_PATH = "cache/emerging_words.json"
+TERM_TRACKER_BUCKET_MINUTES = 60   # 集計バケットの幅
+TERM_TRACKER_BUCKETS = 24          # 保持するバケット数（直近1つ + 平常時の比較用）
+TERM_TRACKER_SKETCH_WIDTH = 4096   # Count-Min Sketchの列数
+TERM_TRACKER_SKETCH_DEPTH = 4      # Count-Min Sketchの行数（ハッシュ数）
+TERM_TRACKER_HEAVY_HITTERS = 200   # バケットごとに追跡する上位語の数
+TERM_TRACKER_MIN_COUNT = 2         # 急上昇ワードとする最小言及トレンド数（誤差を除いた保証値）
+TERM_TRACKER_MIN_RATIO = 2.0       # 平常時に対する最小伸び率
+TERM_TRACKER_SMOOTHING = 0.1       # 伸び率計算の平滑化（1実行あたりの言及率に加算）
+TERM_TRACKER_TOP_N = 10            # 出力する急上昇ワード数
+
 # ================================================
 # エンリッチメント設定 (Enricher用)
 # ================================================
 GENERATE_GOOGLE_LINK = True
 GENERATE_MERCARI_LINK = True
 MERCARI_AFFILIATE_ID = os.environ.get('MERCARI_AFFILIATE_ID', '')
+# スコア計算の重み（変更後は replay.py で過去分を再計算できる）
 W1_RANK = 0.4
 W2_POSTS = 0.3
 W3_VELOCITY = 0.3
-VELOCITY_THRESHOLD_HIGH = 20
+SUMMARY_MAX_CHARS = 100        # 概要の最大文字数
+SUMMARY_MAX_SENTENCES = 2      # 概要に使う文の最大数（中心性の高い順）
+SUMMARY_DAMPING = 0.85         # TextRankの減衰係数
+SUMMARY_MAX_ITERATIONS = 50    # TextRankの反復上限
+
+# バースト検出（投稿数のEWMA z-score）
+BURST_STATE_PATH = "cache/burst_state.json"
+BURST_EWMA_TAU_MINUTES = 60    # EWMAの時定数（分）。観測間隔が不規則でも同じ減衰になる
+BURST_ENTER_Z = 2.0            # このz以上でバースト状態に入る
+BURST_EXIT_Z = 0.5             # バースト中はこのz未満で抜ける
+BURST_COOLING_Z = -1.0         # このz以下は下降中
+BURST_NEW_TREND_Z = 2.5        # 初登場トレンドに与えるバースト強度
+BURST_NEW_TREND_MAX_RANK = 10  # 初登場トレンドはこの順位より上で現れた場合のみバーストとみなす
+BURST_PRIOR_VAR = 0.05         # 初登場時の分散の初期値
+BURST_VAR_FLOOR = 0.01         # 分散が小さすぎるときのz-scoreの暴れを防ぐ下限
+BURST_STATE_TTL_HOURS = 24     # この時間観測されないトレンドの状態は破棄
+BURST_STRENGTH_FOR_MAX_VELOCITY = 3.0  # このバースト強度でVelocity指標が100になる
 
 # ================================================
 # アクセス解析設定 (Generator用)
@@ -61,4 +124,40 @@ GA4_TRACKING_ID = os.environ.get('GA4_TRACKING_ID', 'G-DEFAULTXXXXXXXX')
 TEMPLATE_DIR = "templates"
 TEMPLATE_NAME = "layout.html"
 OUTPUT_DIR = "dist"
-TIMEZONE = "Asia/Tokyo"
\ No newline at end of file
+TIMEZONE = "Asia/Tokyo"
+
+# index.htmlにインライン展開する初回表示トレンド数（「すべて」タブのスコア上位）
+FIRST_VIEW_TREND_COUNT = 30
+
+# バブル配置 (Phyllotaxis) のビューポート区分
+# max_width: この幅(px)以下のコンテナに適用（Noneは上限なし）。小さい順に並べる
+LAYOUT_VIEWPORTS = {
+    "mobile": {"max_width": 640, "spacing": 38, "min_diameter": 44, "max_diameter": 90},
+    "desktop": {"max_width": None, "spacing": 55, "min_diameter": 60, "max_diameter": 130},
+}
+
+# ================================================
+# OGP画像設定 (Generator用)
+# ================================================
+SITE_URL = os.environ.get('SITE_URL', '')  # 公開URL（末尾スラッシュなし）。og:image は絶対URL必須のため、未設定ならOGP画像は生成しない
+OGP_FONT_PATH = os.environ.get('OGP_FONT_PATH', '/usr/share/fonts/opentype/noto/NotoSansCJK-Bold.ttc')
+OGP_CACHE_DIR = "cache/ogp"
+OGP_CACHE_TTL_DAYS = 7         # この期間使われなかったキャッシュ画像は削除
+OGP_MAX_WORKERS = os.cpu_count() or 1
+OGP_SITE_TREND_COUNT = 5       # サイト画像に載せる上位トレンド数
+SHARE_DIR = "cache/share"      # 共有ページとOGP画像の永続化先（distは毎回作り直されるため）
+SHARE_RETENTION_DAYS = 7       # この日数更新されなかった共有ページと、参照されなくなった画像は削除
+
+# ================================================
+# 過去トレンドアーカイブ・検索設定 (Generator用)
+# ================================================
+ARCHIVE_DIR = "cache/archive"   # 時間別/日別ページと検索インデックスの永続化先
+SEARCH_INDEX_SHARDS = 64        # バイグラム索引のシャード数（変更時は索引を自動で作り直す）
+
+# ================================================
+# アーカイブ / リプレイ設定 (Replay用)
+# ================================================
+RAW_ARCHIVE_DIR = "cache/raw"          # 生スナップショット (RawTrendItem) の保存先
+RAW_ARCHIVE_RETENTION_DAYS = 30        # この日数より古い生スナップショットは保存時に削除
+REPLAY_OUTPUT_DIR = "cache/replay"     # リプレイ結果の出力先
+REPLAY_MAX_WORKERS = os.cpu_count() or 1
@@ -4,45 +4,59 @@ VIBRAエンリッチメントモジュール
 スコア計算、ヒートレベル判定、リンク生成
 """
 import os
-import json
 import math
 import urllib.parse
-from typing import List, Dict
+from datetime import datetime
+from typing import List, Dict, Optional
+from zoneinfo import ZoneInfo
 
+import config
+import burst_detector
 import category_classifier
+import summarizer
 from models import AnalyzedTrendItem, EnrichedTrendItem, Link
 
 
-# スコア計算の重み
-W1_RANK = 0.4
-W2_POSTS = 0.3
-W3_VELOCITY = 0.3
-# 急上昇判定の閾値（少し緩和 20 -> 15）
-VELOCITY_THRESHOLD_HIGH = 15
-
 # カテゴリリストは category_classifier.py に移動
 
 
-def enrich_trends(analyzed_trends: List[AnalyzedTrendItem]) -> List[EnrichedTrendItem]:
+def enrich_trends(
+    analyzed_trends: List[AnalyzedTrendItem],
+    burst_states: Optional[Dict[str, burst_detector.BurstState]] = None,
+    observed_at: Optional[datetime] = None,
+    persist: bool = True
+) -> List[EnrichedTrendItem]:
     """
     分析済みトレンドにスコア、ヒートレベル、リンク等を付与する。
     
     Args:
         analyzed_trends: 分析済みトレンドリスト
+        burst_states: バースト検出器の状態（その場で更新される）。Noneの場合はキャッシュから読み込む
+        observed_at: 観測時刻。Noneの場合は現在時刻
+        persist: Trueの場合、検出器の状態をキャッシュに保存する（リプレイ時はFalse）
         
     Returns:
         List[EnrichedTrendItem]: エンリッチメント済みトレンドリスト
     """
     print(f"[INFO][enricher] Enriching {len(analyzed_trends)} trends...")
     
-    # 前回スコアの読み込み
-    previous_scores = _load_previous_scores()
-    current_scores: Dict[str, int] = {}
+    # バースト検出器の状態の読み込み
+    if burst_states is None:
+        burst_states = burst_detector.load_states()
+    if observed_at is None:
+        observed_at = datetime.now(ZoneInfo(config.TIMEZONE))
+    # 状態がない初回は全トレンドが初登場に見えるため、初登場をバースト扱いしない
+    cold_start = not burst_states
+    if cold_start:
+        print("[INFO][enricher] No burst detector state. Treating this run as a cold start.")
     
     # 最大投稿数（正規化用）
     max_posts = max((t.posts_num for t in analyzed_trends), default=1) or 1
     total_trends = len(analyzed_trends)
     
+    # 概要（関連投稿からの抽出型要約。全トレンドを一括処理）
+    summaries = summarizer.summarize_trends(analyzed_trends)
+    
     enriched_list: List[EnrichedTrendItem] = []
     
     for i, trend in enumerate(analyzed_trends):
@@ -50,31 +64,24 @@ def enrich_trends(analyzed_trends: List[AnalyzedTrendItem]) -> List[EnrichedTren
         rank_metric = (1 - (i / total_trends)) * 100 if total_trends > 0 else 50
         post_metric = (math.log1p(trend.posts_num) / math.log1p(max_posts)) * 100
         
-        previous_score = previous_scores.get(trend.title, 0)
-        # 前回のスコアがない（新規）場合は高めのVelocityを与える
-        if previous_score == 0:
-            velocity_metric = 100 
-        else:
-            velocity_metric = max(0, 100 - (previous_score - 0)) # 簡易計算
-            
-        # Velocity計算の精密化: 今回ランクインして、かつ前回より高い場合にスコアを加算したいが、
-        # ここではシンプルに「現在の勢い」を表現する構成にする
+        # Velocity: 投稿数の平常値からの上振れ（バースト強度）で「現在の勢い」を表す
+        burst_state, burst_strength = burst_detector.update(
+            burst_states, trend.title, trend.posts_num, observed_at,
+            rank=i, cold_start=cold_start
+        )
+        velocity_metric = min(100, burst_strength / config.BURST_STRENGTH_FOR_MAX_VELOCITY * 100)
         
         score = int(
-            W1_RANK * rank_metric +
-            W2_POSTS * post_metric +
-            W3_VELOCITY * velocity_metric
+            config.W1_RANK * rank_metric +
+            config.W2_POSTS * post_metric +
+            config.W3_VELOCITY * velocity_metric
         )
         score = min(100, max(0, score))
-        current_scores[trend.title] = score
         
         # ヒートレベル判定
-        velocity_diff = score - previous_score
-        
-        # 条件緩和: 
-        # 1. 急上昇 (Diff >= 15) かつ スコア50以上
-        # 2. 殿堂入り級 (Score >= 90) -> 常にHigh
-        if (velocity_diff >= VELOCITY_THRESHOLD_HIGH and score > 50) or score >= 90:
+        # 1. バースト中 -> High（スコアが高いだけの定番トレンドはHighにしない）
+        # 2. スコア60超 -> Medium
+        if burst_state == burst_detector.BURST:
             heat_level = 'high'
         elif score > 60:
             heat_level = 'medium'
@@ -87,14 +94,6 @@ def enrich_trends(analyzed_trends: List[AnalyzedTrendItem]) -> List[EnrichedTren
         # カテゴリ分類（キーワードマッチング戦略）
         category = category_classifier.classify_category(trend)
         
-        # 概要（最初の関連投稿を使用）
-        summary = ""
-        if trend.related_posts and len(trend.related_posts) > 0:
-            summary = trend.related_posts[0]
-            # 長すぎる場合は切り詰め
-            if len(summary) > 100:
-                summary = summary[:100] + "..."
-
         # EnrichedTrendItem生成
         enriched_list.append(EnrichedTrendItem(
             title=trend.title,
@@ -105,35 +104,19 @@ def enrich_trends(analyzed_trends: List[AnalyzedTrendItem]) -> List[EnrichedTren
             links=links,
             category=category,
             cluster_id=trend.cluster_id,
-            summary=summary
+            summary=summaries[i],
+            burst_state=burst_state,
+            burst_strength=burst_strength
         ))
     
-    # 現在スコアを保存（次回実行用）
-    _save_current_scores(current_scores)
+    # 検出器の状態を保存（次回実行用）
+    if persist:
+        burst_detector.save_states(burst_states, observed_at)
     
     print(f"[INFO][enricher] Enrichment complete.")
     return enriched_list
 
 
-def _load_previous_scores() -> Dict[str, int]:
-    """前回のスコアデータを読み込む"""
-    path = 'cache/previous_scores.json'
-    if not os.path.exists(path):
-        return {}
-    try:
-        with open(path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError):
-        return {}
-
-
-def _save_current_scores(scores: Dict[str, int]) -> None:
-    """現在のスコアを保存"""
-    os.makedirs('cache', exist_ok=True)
-    with open('cache/scores_to_cache.json', 'w', encoding='utf-8') as f:
-        json.dump(scores, f, ensure_ascii=False, indent=2)
-
-
 def _generate_links(keyword: str) -> List[Link]:
     """キーワードに基づくリンクを生成"""
     query = urllib.parse.quote(keyword)
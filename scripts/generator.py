@@ -6,11 +6,18 @@ VIBRAサイトジェネレーター
 import os
 import json
 import shutil
+import hashlib
 import sys
 from datetime import datetime
 from typing import List, Dict, Any
-from jinja2 import Environment, FileSystemLoader
+from zoneinfo import ZoneInfo
+import numpy as np
+from jinja2 import Environment, FileSystemLoader, select_autoescape
 
+import config
+import archive_builder
+import share_builder
+import ogp_renderer
 from models import EnrichedTrendItem, Link
 
 
@@ -27,6 +34,9 @@ CATEGORY_MAPPING = {
     'social': 'all'
 }
 
+# 黄金角（ラジアン）: Phyllotaxis配置の回転角
+GOLDEN_ANGLE_RAD = np.deg2rad(137.508)
+
 
 def generate_site_from_cache():
     """キャッシュからデータを読み込み、静的サイトを生成する"""
@@ -43,13 +53,23 @@ def generate_site_from_cache():
     try:
         with open(cache_path, 'r', encoding='utf-8') as f:
             raw_data = json.load(f)
-            # JSONからEnrichedTrendItemを復元
-            trends_data = _deserialize_trends(raw_data)
-            print(f"Loaded and deserialized {len(trends_data)} trends from cache.")
-    except (FileNotFoundError, json.JSONDecodeError, TypeError) as e:
+        # {"fetched_at": ISO8601, "trends": [...]} 形式。
+        # 旧形式（トレンドの配列のみ）はファイルの更新時刻を取得時刻とみなす
+        if isinstance(raw_data, list):
+            fetched_at = datetime.fromtimestamp(os.path.getmtime(cache_path), ZoneInfo(config.TIMEZONE))
+        else:
+            fetched_at = datetime.fromisoformat(raw_data["fetched_at"])
+            raw_data = raw_data["trends"]
+        # JSONからEnrichedTrendItemを復元
+        trends_data = _deserialize_trends(raw_data)
+        print(f"Loaded and deserialized {len(trends_data)} trends from cache (fetched at {fetched_at.isoformat()}).")
+    except (FileNotFoundError, json.JSONDecodeError, TypeError, KeyError, ValueError) as e:
         print(f"[CRITICAL] Failed to load cache file '{cache_path}'. Error: {e}", file=sys.stderr)
         sys.exit(1)
 
+    # 2.5 急上昇ワード（未生成なら空）
+    emerging_words = _load_emerging_words(os.path.join(base_dir, config.EMERGING_WORDS_PATH))
+
     # 3. distディレクトリ準備
     if os.path.exists(dist_dir):
         shutil.rmtree(dist_dir)
@@ -88,28 +108,67 @@ def generate_site_from_cache():
     
     # 4. フロントエンド用データに変換
     frontend_trends = [_transform_for_frontend(item) for item in trends_data]
+    for i, trend in enumerate(frontend_trends):
+        trend["id"] = i
+    _attach_layouts(frontend_trends)
+
+    # 4.5 トレンドごとの共有ページ（タイトルから決まるので、同じトレンドは毎回同じURL）
+    for trend, item in zip(frontend_trends, trends_data):
+        trend["share_url"] = f"share/{_share_slug(item.title)}.html"
+
+    # 4.6 OGP画像（内容が変わらないトレンドはキャッシュから再利用）
+    # og:image は絶対URLでないとクローラーが読めないため、SITE_URL未設定なら描画しない
+    # 共有ページと同じく保持期間中は参照されるため、distではなく共有ページの保存先に置く
+    share_dir = os.path.join(base_dir, config.SHARE_DIR)
+    if config.SITE_URL:
+        trend_images, site_image = ogp_renderer.render_ogp_images(
+            trends_data, share_builder.site_dir(share_dir), cache_dir=os.path.join(base_dir, config.OGP_CACHE_DIR)
+        )
+    else:
+        print("[WARNING][ogp] SITE_URL is not set. Skipping OGP images (og:image requires an absolute URL).")
+        trend_images, site_image = [''] * len(trends_data), ''
 
     # 5. フロントエンドデータ保存
-    trends_json_dst = os.path.join(dist_dir, 'trends.json')
-    output_data = {
-        "trends": frontend_trends,
-        "last_updated": datetime.now().strftime('%Y-%m-%d %H:%M')
+    cache_bust_version = int(datetime.now().timestamp())
+    output_meta = {
+        "viewports": {name: vp["max_width"] for name, vp in config.LAYOUT_VIEWPORTS.items()},
+        "last_updated": fetched_at.strftime('%Y-%m-%d %H:%M'),
+        "version": cache_bust_version,
+        "emerging_words": emerging_words
     }
-    with open(trends_json_dst, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=2)
+
+    # 5.1 全件データ（「すべて」タブ用。初回描画後にクライアントが読み込む）
+    trends_json_dst = os.path.join(dist_dir, 'trends.json')
+    _write_json(trends_json_dst, {"trends": frontend_trends, **output_meta})
     print(f"Generated frontend data at {trends_json_dst}")
 
+    # 5.2 カテゴリ別シャード（全件読み込み前にタブが開かれた場合のみ取得される）
+    shards_dir = os.path.join(dist_dir, 'data')
+    os.makedirs(shards_dir, exist_ok=True)
+    shards: Dict[str, List[Dict[str, Any]]] = {}
+    for trend in frontend_trends:
+        if trend["category"] != 'all':
+            shards.setdefault(trend["category"], []).append(trend)
+    for genre, genre_trends in shards.items():
+        _write_json(os.path.join(shards_dir, f'trends-{genre}.json'), {"trends": genre_trends, **output_meta})
+    print(f"Generated {len(shards)} category shards in {shards_dir}")
+
+    # 5.3 初回表示用データ（index.htmlにインライン展開し、trends.jsonの取得を待たずに描画する）
+    first_view_trends = sorted(frontend_trends, key=lambda t: -t["score"])[:config.FIRST_VIEW_TREND_COUNT]
+    initial_data = {"trends": first_view_trends, "complete": len(first_view_trends) == len(frontend_trends), **output_meta}
+
     # 6. HTMLレンダリング
-    env = Environment(loader=FileSystemLoader(templates_dir))
+    env = Environment(loader=FileSystemLoader(templates_dir), autoescape=select_autoescape(['html']))
     template_vars = {
         'ga4_tracking_id': os.environ.get('GA4_TRACKING_ID', ''),
         'current_year': datetime.now().year,
-        'cache_bust_version': int(datetime.now().timestamp())
+        'cache_bust_version': cache_bust_version,
+        'site_url': config.SITE_URL
     }
     
     # index.html
     template = env.get_template('layout.html')
-    html_content = template.render(**template_vars)
+    html_content = template.render(initial_data=initial_data, ogp_image_url=share_builder.absolute_url(site_image), **template_vars)
     with open(os.path.join(dist_dir, 'index.html'), 'w', encoding='utf-8') as f:
         f.write(html_content)
     print("Generated index.html")
@@ -123,10 +182,50 @@ def generate_site_from_cache():
         print("Generated guidelines.html")
     except Exception as e:
         print(f"[WARN] Could not generate guidelines.html: {e}")
+
+    # 6.5 トレンドごとの共有ページ（今回分のみ更新し、保持期間内の蓄積分をdistへ配置）
+    share_site_dir = share_builder.update_share_pages(
+        frontend_trends, trend_images, site_image, env, fetched_at,
+        share_dir=share_dir,
+        last_updated=output_meta["last_updated"],
+        **template_vars
+    )
+    shutil.copytree(share_site_dir, dist_dir, dirs_exist_ok=True)
+    print(f"Copied share pages and OGP images to {dist_dir}")
+
+    # 7. 過去トレンドのアーカイブと検索インデックス（今回分のみ増分更新し、蓄積分をdistへ配置）
+    # 日付・時間帯は生成時刻ではなく取得時刻で決める（日付をまたいで生成されても取得日に入る）
+    archive_site_dir = archive_builder.update_archive(
+        trends_data, env, fetched_at,
+        archive_dir=os.path.join(base_dir, config.ARCHIVE_DIR)
+    )
+    shutil.copytree(archive_site_dir, dist_dir, dirs_exist_ok=True)
+    print(f"Copied archive pages and search index to {dist_dir}")
         
     print(f"[INFO] DEPLOYER pipeline complete. Site generated in '{dist_dir}'.")
 
 
+def _share_slug(title: str) -> str:
+    """共有ページのファイル名（タイトルのハッシュ）"""
+    return hashlib.sha1(title.encode('utf-8')).hexdigest()[:12]
+
+
+def _write_json(path: str, data: Dict[str, Any]) -> None:
+    """フロントエンド配信用JSONを空白なしで書き出す"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def _load_emerging_words(path: str) -> List[Dict[str, Any]]:
+    """term_trackerが書き出した急上昇ワードを読み込む"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"[WARNING] Emerging words not available: {e}")
+        return []
+
+
 def _deserialize_trends(raw_data: List[Dict[str, Any]]) -> List[EnrichedTrendItem]:
     """JSONデータからEnrichedTrendItemを復元"""
     items = []
@@ -145,18 +244,20 @@ def _deserialize_trends(raw_data: List[Dict[str, Any]]) -> List[EnrichedTrendIte
             links=links,
             category=data['category'],
             cluster_id=data.get('cluster_id', 0),
-            summary=data.get('summary', "")
+            summary=data.get('summary', ""),
+            burst_state=data.get('burst_state', "steady"),
+            burst_strength=data.get('burst_strength', 0.0)
         ))
     return items
 
 
 def _transform_for_frontend(item: EnrichedTrendItem) -> Dict[str, Any]:
     """EnrichedTrendItemをフロントエンド用形式に変換"""
-    # ステージ判定（緩和）
-    # High heat OR high score triggers peak visuals
-    if item.heatLevel == 'high' or item.score > 85:
+    # ステージ判定
+    # バースト中（急上昇）-> peak、下降中 or 低スコア -> fading
+    if item.burst_state == 'burst' or item.heatLevel == 'high':
         stage = 'peak'
-    elif item.score < 30:
+    elif item.burst_state == 'cooling' or item.score < 30:
         stage = 'fading'
     else:
         stage = 'newborn'
@@ -192,9 +293,48 @@ def _transform_for_frontend(item: EnrichedTrendItem) -> Dict[str, Any]:
         "detail_url": detail_url,
         "related_words": item.co_occurring_words if item.co_occurring_words else [], 
         "cluster_id": item.cluster_id,
-        "summary": item.summary if item.summary else "詳細情報なし"
+        "summary": item.summary if item.summary else "詳細情報なし",
+        "burst_state": item.burst_state,
+        "burst_strength": item.burst_strength
     }
 
 
+def _attach_layouts(frontend_trends: List[Dict[str, Any]]) -> None:
+    """
+    ジャンル × ビューポートごとのバブル配置を計算し、各トレンドの "layout" に格納する。
+    クライアントは再計算せず、この座標にノードを置いて表示/非表示を切り替えるだけにする。
+
+    layout形式: {viewport: {genre: [x, y, r]}}
+      x, y はコンテナ中心からのオフセット(px)、r はバブル半径(px)。
+      トレンドが属さないジャンルのキーは存在しない。
+    """
+    for trend in frontend_trends:
+        trend["layout"] = {}
+    if not frontend_trends:
+        return
+
+    scores = np.array([t["score"] for t in frontend_trends], dtype=float)
+    categories = np.array([t["category"] for t in frontend_trends])
+    genres = ['all'] + sorted(set(categories.tolist()) - {'all'})
+
+    for viewport, params in config.LAYOUT_VIEWPORTS.items():
+        for genre in genres:
+            members = np.arange(len(frontend_trends)) if genre == 'all' else np.flatnonzero(categories == genre)
+            # スコア降順（同点は元の順序）で中心から外側へ並べる
+            order = members[np.argsort(-scores[members], kind='stable')]
+
+            # Phyllotaxis: theta = i * 黄金角, r = spacing * sqrt(i)
+            index = np.arange(len(order))
+            angle = index * GOLDEN_ANGLE_RAD
+            distance = params["spacing"] * np.sqrt(index)
+            xs = np.round(distance * np.cos(angle), 1)
+            ys = np.round(distance * np.sin(angle), 1)
+            diameters = params["min_diameter"] + (scores[order] / 100) * (params["max_diameter"] - params["min_diameter"])
+            radii = np.round(diameters / 2, 1)
+
+            for trend_index, x, y, r in zip(order.tolist(), xs.tolist(), ys.tolist(), radii.tolist()):
+                frontend_trends[trend_index]["layout"].setdefault(viewport, {})[genre] = [x, y, r]
+
+
 if __name__ == "__main__":
     generate_site_from_cache()
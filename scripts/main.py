@@ -6,47 +6,79 @@ VIBRAフェッチャーパイプライン
 import sys
 import json
 import os
-from typing import List
+from datetime import datetime
+from typing import List, Optional
+from zoneinfo import ZoneInfo
 
 import scraper
 import analyzer
 import enricher
+import raw_archive
+import term_tracker
+import config
 from models import RawTrendItem, AnalyzedTrendItem, EnrichedTrendItem
 
 
-def run_fetcher_pipeline():
-    """型安全なdataclassを使用したデータパイプラインを実行"""
+def run_fetcher_pipeline(
+    raw_trend_items: Optional[List[RawTrendItem]] = None,
+    fetched_at: Optional[datetime] = None
+):
+    """
+    型安全なdataclassを使用したデータパイプラインを実行
+    
+    Args:
+        raw_trend_items: 取得済みの生データ（scheduler経由）。Noneの場合はここでスクレイピングする
+        fetched_at: raw_trend_itemsの取得時刻。Noneの場合は現在時刻
+    """
     print("[INFO] Starting FETCHER pipeline...")
+    if fetched_at is None:
+        fetched_at = datetime.now(ZoneInfo(config.TIMEZONE))
     
     # 1. Scrape: List[RawTrendItem]を取得
-    print("Fetching trends...")
-    raw_trend_items: List[RawTrendItem] = scraper.fetch_raw_trends()
+    if raw_trend_items is None:
+        print("Fetching trends...")
+        raw_trend_items = scraper.fetch_raw_trends()
     if not raw_trend_items:
         print("[CRITICAL] No raw trends acquired. Halting.", file=sys.stderr)
         sys.exit(1)
     print(f"[INFO] Fetched {len(raw_trend_items)} trends.")
     
+    # 1.5 Archive: 再処理（リプレイ）用に生データを保存
+    archive_path = raw_archive.save_raw_snapshot(raw_trend_items, fetched_at)
+    print(f"[INFO] Archived raw snapshot to {archive_path}")
+    
     # 2. Analyze: List[RawTrendItem] → List[AnalyzedTrendItem]
     print("Analyzing trends...")
     analyzed_trends: List[AnalyzedTrendItem] = analyzer.analyze_trends(raw_trend_items)
     
     # 3. Enrich: List[AnalyzedTrendItem] → List[EnrichedTrendItem]
     print("Enriching data...")
-    enriched_trends: List[EnrichedTrendItem] = enricher.enrich_trends(analyzed_trends)
+    enriched_trends: List[EnrichedTrendItem] = enricher.enrich_trends(analyzed_trends, observed_at=fetched_at)
+    
+    # 3.5 Track: 実行をまたいだ名詞の頻度から急上昇ワードを求める
+    print("Tracking emerging words...")
+    emerging_words = term_tracker.track(analyzed_trends, fetched_at)
     
     # 4. Save to cache（最終シリアライズ時のみdict変換）
+    # 取得時刻も保存し、generatorがアーカイブの日付・時間帯に使う
     output_dir = "cache"
     os.makedirs(output_dir, exist_ok=True)
     output_path = os.path.join(output_dir, "latest_trends.json")
     
     with open(output_path, 'w', encoding='utf-8') as f:
         json.dump(
-            [item.to_dict() for item in enriched_trends],
+            {
+                "fetched_at": fetched_at.isoformat(),
+                "trends": [item.to_dict() for item in enriched_trends]
+            },
             f,
             ensure_ascii=False,
             indent=2
         )
         
+    with open(config.EMERGING_WORDS_PATH, 'w', encoding='utf-8') as f:
+        json.dump(emerging_words, f, ensure_ascii=False, indent=2)
+        
     print(f"[INFO] FETCHER pipeline complete. Saved data to {output_path}")
 
 
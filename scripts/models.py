@@ -23,6 +23,22 @@ class RawTrendItem:
     posts_num: int
     detail_url: str
     related_posts: List[str] = field(default_factory=list)
+    source: str = ""    # 取得元ソース名（マージ後は代表ソース）
+
+
+@dataclass(frozen=True)
+class TrendSource:
+    """トレンド取得元の定義（スクレイパーのプラグイン単位）"""
+    name: str
+    url: str
+    item_selector: str          # 一覧ページで各トレンドを囲む要素
+    title_selector: str
+    posts_count_selector: str
+    detail_url_selector: str
+    post_text_selector: str     # 詳細ページの投稿本文
+    backend: str = "selenium"   # 'selenium' | 'requests'
+    base_url: str = ""          # 相対URLの解決に使用
+    request_interval_seconds: float = 1.0  # 同一ソースへの連続リクエスト間隔
 
 
 @dataclass(frozen=True)
@@ -34,6 +50,9 @@ class AnalyzedTrendItem:
     related_posts: List[str]
     co_occurring_words: List[str]
     cluster_id: int
+    sentences: List[str] = field(default_factory=list)              # 関連投稿を文単位に分割したもの
+    sentence_tokens: List[List[str]] = field(default_factory=list)  # 各文の内容語（要約で再利用）
+    nouns: List[str] = field(default_factory=list)                  # タイトル・関連投稿中の名詞（急上昇ワード集計用）
 
 
 @dataclass(frozen=True)
@@ -48,6 +67,8 @@ class EnrichedTrendItem:
     category: str
     cluster_id: int
     summary: str = ""
+    burst_state: str = "steady"   # 'burst' | 'steady' | 'cooling'
+    burst_strength: float = 0.0   # 平常からの上振れ（正のz-score）
 
     def to_dict(self) -> Dict:
         """JSON保存用の辞書変換"""
@@ -0,0 +1,213 @@
+# scripts/ogp_renderer.py
+"""
+VIBRA OGP画像レンダラー
+EnrichedTrendItemからトレンドごと・サイト全体のシェア画像(1200x630)を生成する。
+
+- 画像は入力内容のハッシュでキャッシュし、内容が変わらないトレンドは再描画しない。
+  スコアやヒートレベルは毎サイクル変わるため描画内容に含めない（含めるとほぼ毎回キャッシュが外れる）。
+- 未キャッシュ分のみプロセスプールで並列描画し、フォントはワーカーごとに1回だけ読み込む。
+"""
+import os
+import json
+import time
+import shutil
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+import config
+from models import EnrichedTrendItem
+
+
+# 描画内容を変更したら上げる（キャッシュを無効化するため）
+TEMPLATE_VERSION = 2
+
+IMAGE_SIZE = (1200, 630)
+BACKGROUND_COLOR = (0, 0, 0)
+ACCENT_COLOR = (239, 68, 68)
+FONT_SIZES = {'brand': 40, 'title': 64, 'body': 32, 'meta': 28}
+
+# ワーカープロセス内で共有するフォント（_init_workerで設定）
+_fonts: Dict[str, ImageFont.ImageFont] = {}
+
+
+def render_ogp_images(
+    trends: List[EnrichedTrendItem],
+    output_dir: str,
+    cache_dir: str = config.OGP_CACHE_DIR
+) -> Tuple[List[str], str]:
+    """
+    トレンドごと・サイト全体のOGP画像を用意し、output_dir/ogp/ に配置する。
+
+    Returns:
+        (各トレンドの画像パスのリスト, サイト画像のパス)。パスはoutput_dirからの相対パス
+    """
+    started = time.perf_counter()
+    os.makedirs(cache_dir, exist_ok=True)
+    ogp_dir = os.path.join(output_dir, 'ogp')
+    os.makedirs(ogp_dir, exist_ok=True)
+
+    # 1. 描画ジョブを作成（キーは描画内容のハッシュ）
+    # フォントの有無も描画結果を変えるため、キーに含める
+    font_id = os.path.basename(config.OGP_FONT_PATH) if os.path.exists(config.OGP_FONT_PATH) else 'default'
+    jobs: Dict[str, Dict] = {}
+    trend_keys: List[str] = []
+    for trend in trends:
+        payload = {
+            "kind": "trend",
+            "title": trend.title,
+            "summary": trend.summary,
+            "words": list(trend.co_occurring_words),
+        }
+        key = _content_hash(payload, font_id)
+        jobs[key] = payload
+        trend_keys.append(key)
+
+    site_payload = {
+        "kind": "site",
+        "titles": [t.title for t in sorted(trends, key=lambda t: -t.score)[:config.OGP_SITE_TREND_COUNT]],
+    }
+    site_key = _content_hash(site_payload, font_id)
+    jobs[site_key] = site_payload
+
+    # 2. キャッシュにないものだけ並列描画
+    missing = {key: payload for key, payload in jobs.items()
+               if not os.path.exists(os.path.join(cache_dir, f'{key}.png'))}
+    if missing:
+        workers = min(len(missing), config.OGP_MAX_WORKERS)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(config.OGP_FONT_PATH,)) as executor:
+            list(executor.map(_render_job, [(key, payload, cache_dir) for key, payload in missing.items()]))
+
+    # 3. output_dirへコピーし、使用中のキャッシュは更新時刻を記録（古いものの掃除に使う）
+    for key in jobs:
+        cached_path = os.path.join(cache_dir, f'{key}.png')
+        shutil.copyfile(cached_path, os.path.join(ogp_dir, f'{key}.png'))
+        os.utime(cached_path)
+    _prune_cache(cache_dir)
+
+    elapsed = time.perf_counter() - started
+    hits = len(jobs) - len(missing)
+    print(f"[INFO][ogp] {len(jobs)} images ready in {elapsed:.2f}s "
+          f"(rendered {len(missing)}, cache hit rate {hits / len(jobs):.0%}).")
+
+    return [f'ogp/{key}.png' for key in trend_keys], f'ogp/{site_key}.png'
+
+
+def _content_hash(payload: Dict, font_id: str) -> str:
+    """描画入力からキャッシュキーを作る"""
+    data = json.dumps({"v": TEMPLATE_VERSION, "font": font_id, **payload}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()[:20]
+
+
+def _prune_cache(cache_dir: str) -> None:
+    """一定期間使われていないキャッシュ画像を削除する"""
+    expire_before = time.time() - config.OGP_CACHE_TTL_DAYS * 86400
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if name.endswith('.png') and os.path.getmtime(path) < expire_before:
+            os.remove(path)
+
+
+# ================================================
+# ワーカープロセス側
+# ================================================
+
+def _init_worker(font_path: str) -> None:
+    """ワーカー起動時にフォントを1回だけ読み込む"""
+    for name, size in FONT_SIZES.items():
+        try:
+            _fonts[name] = ImageFont.truetype(font_path, size)
+        except OSError:
+            # 日本語フォントがない環境でも落ちないようにする（表示品質は落ちる）
+            _fonts[name] = ImageFont.load_default(size)
+    if not os.path.exists(font_path):
+        print(f"[WARNING][ogp] Font not found: {font_path}. Using default font.")
+
+
+def _render_job(job: Tuple[str, Dict, str]) -> str:
+    """1枚描画してキャッシュに保存する"""
+    key, payload, cache_dir = job
+    if payload["kind"] == "site":
+        image = _draw_site(payload)
+    else:
+        image = _draw_trend(payload)
+
+    path = os.path.join(cache_dir, f'{key}.png')
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    image.save(tmp_path, format='PNG', optimize=True)
+    os.replace(tmp_path, path)
+    return key
+
+
+def _draw_trend(payload: Dict) -> Image.Image:
+    """トレンド単体のOGP画像"""
+    image, draw = _new_canvas(ACCENT_COLOR)
+    width, height = IMAGE_SIZE
+
+    y = 150
+    for line in _wrap_text(draw, payload["title"], _fonts['title'], width - 160, max_lines=3):
+        draw.text((80, y), line, font=_fonts['title'], fill=(255, 255, 255))
+        y += 80
+
+    if payload["summary"]:
+        y += 20
+        for line in _wrap_text(draw, payload["summary"], _fonts['body'], width - 160, max_lines=2):
+            draw.text((80, y), line, font=_fonts['body'], fill=(209, 213, 219))
+            y += 44
+
+    if payload["words"]:
+        draw.text((80, height - 80), ' / '.join(payload["words"]), font=_fonts['meta'], fill=(110, 231, 183))
+    return image
+
+
+def _draw_site(payload: Dict) -> Image.Image:
+    """サイト全体（トップページ）のOGP画像"""
+    image, draw = _new_canvas(ACCENT_COLOR)
+    width, _ = IMAGE_SIZE
+
+    y = 150
+    for rank, title in enumerate(payload["titles"], start=1):
+        line = _wrap_text(draw, f'{rank}. {title}', _fonts['body'], width - 160, max_lines=1)
+        draw.text((80, y), line[0] if line else '', font=_fonts['body'], fill=(255, 255, 255))
+        y += 64
+    return image
+
+
+def _new_canvas(accent: Tuple[int, int, int]) -> Tuple[Image.Image, ImageDraw.ImageDraw]:
+    """背景・アクセントバー・ブランド名を描いたキャンバスを返す"""
+    image = Image.new('RGB', IMAGE_SIZE, BACKGROUND_COLOR)
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, 0, IMAGE_SIZE[0], 12), fill=accent)
+    draw.text((80, 60), 'VIBRA', font=_fonts['brand'], fill=(167, 139, 250))
+    return image, draw
+
+
+def _wrap_text(draw: ImageDraw.ImageDraw, text: str, font, max_width: int, max_lines: int) -> List[str]:
+    """
+    文字単位で折り返す（日本語は単語区切りがないため）。
+    max_linesを超える場合は最終行を「…」で切り詰める。
+    """
+    lines: List[str] = []
+    current = ''
+    for char in text.replace('\n', ' '):
+        if draw.textlength(current + char, font=font) > max_width:
+            lines.append(current)
+            current = char
+            if len(lines) == max_lines:
+                break
+        else:
+            current += char
+    else:
+        if current:
+            lines.append(current)
+        return lines
+
+    # 切り詰め
+    last = lines[-1]
+    while last and draw.textlength(last + '…', font=font) > max_width:
+        last = last[:-1]
+    lines[-1] = last + '…'
+    return lines
@@ -0,0 +1,112 @@
+# scripts/raw_archive.py
+"""
+VIBRA生データアーカイブ
+スクレイパーが返したRawTrendItemのリストを実行ごとにコンパクトに保存し、
+リプレイ（再処理）用に時系列順で読み出す。
+
+保存形式: {RAW_ARCHIVE_DIR}/YYYYMMDD/HHMMSS.json.gz
+  {"fetched_at": ISO8601, "items": [[title, posts_num, detail_url, [posts...], source], ...]}
+  （sourceのない4要素の行は旧形式。読み込み時は空文字として扱う）
+RAW_ARCHIVE_RETENTION_DAYS を過ぎた日付ディレクトリは保存時に削除する。
+"""
+import os
+import gzip
+import shutil
+import json
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import config
+from models import RawTrendItem
+
+
+def save_raw_snapshot(
+    raw_trends: List[RawTrendItem],
+    fetched_at: Optional[datetime] = None,
+    archive_dir: str = config.RAW_ARCHIVE_DIR
+) -> str:
+    """
+    RawTrendItemのリストをgzip圧縮JSONとして保存する。
+
+    Returns:
+        str: 保存したファイルのパス
+    """
+    if fetched_at is None:
+        fetched_at = datetime.now(ZoneInfo(config.TIMEZONE))
+
+    day_dir = os.path.join(archive_dir, fetched_at.strftime('%Y%m%d'))
+    os.makedirs(day_dir, exist_ok=True)
+    path = os.path.join(day_dir, fetched_at.strftime('%H%M%S') + '.json.gz')
+
+    payload = {
+        "fetched_at": fetched_at.isoformat(),
+        # dictではなく配列で保存し、キー名の重複を避ける
+        "items": [
+            [item.title, item.posts_num, item.detail_url, list(item.related_posts), item.source]
+            for item in raw_trends
+        ]
+    }
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(',', ':'))
+
+    _prune_old_days(archive_dir, fetched_at)
+    return path
+
+
+def _prune_old_days(archive_dir: str, now: datetime) -> None:
+    """保持期間を過ぎた日付ディレクトリを削除する"""
+    oldest_kept = (now - timedelta(days=config.RAW_ARCHIVE_RETENTION_DAYS)).strftime('%Y%m%d')
+    for day in os.listdir(archive_dir):
+        day_dir = os.path.join(archive_dir, day)
+        if day.isdigit() and len(day) == 8 and day < oldest_kept and os.path.isdir(day_dir):
+            shutil.rmtree(day_dir)
+            print(f"[INFO][raw_archive] Removed snapshots older than "
+                  f"{config.RAW_ARCHIVE_RETENTION_DAYS} days: {day}")
+
+
+def load_raw_snapshot(path: str) -> Tuple[datetime, List[RawTrendItem]]:
+    """保存済みスナップショットを読み込み、取得時刻とRawTrendItemのリストを返す"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        payload = json.load(f)
+
+    items = [
+        RawTrendItem(
+            title=title,
+            posts_num=posts_num,
+            detail_url=detail_url,
+            related_posts=related_posts,
+            source=source[0] if source else ""
+        )
+        for title, posts_num, detail_url, related_posts, *source in payload["items"]
+    ]
+    return datetime.fromisoformat(payload["fetched_at"]), items
+
+
+def iter_snapshot_paths(
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    archive_dir: str = config.RAW_ARCHIVE_DIR
+) -> Iterator[str]:
+    """
+    スナップショットのパスを時系列順に列挙する。
+
+    Args:
+        since: 開始日 'YYYYMMDD'（含む）。Noneなら制限なし
+        until: 終了日 'YYYYMMDD'（含む）。Noneなら制限なし
+    """
+    if not os.path.isdir(archive_dir):
+        return
+
+    # ディレクトリ名・ファイル名がゼロ埋めの日時なので、文字列ソート = 時系列順
+    for day in sorted(os.listdir(archive_dir)):
+        if since and day < since:
+            continue
+        if until and day > until:
+            continue
+        day_dir = os.path.join(archive_dir, day)
+        if not os.path.isdir(day_dir):
+            continue
+        for name in sorted(os.listdir(day_dir)):
+            if name.endswith('.json.gz'):
+                yield os.path.join(day_dir, name)
@@ -0,0 +1,105 @@
+# scripts/replay.py
+"""
+VIBRAリプレイ（バックフィル）パイプライン
+アーカイブ済みの生スナップショットを、ネットワークを使わずに
+analyzer → enricher へ時系列順に流し直す。
+
+- 分析（形態素解析・クラスタリング）はスナップショット間で独立しているため、
+  プロセスプールで並列実行する。
+- エンリッチメントはバースト検出器の状態に依存するため、時系列順に逐次実行する。
+  状態はファイルではなくメモリ上で次のスナップショットへ引き継ぐ。
+
+Usage:
+    python scripts/replay.py --since 20260101 --until 20260131 --workers 8
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import config
+import analyzer
+import enricher
+import raw_archive
+import burst_detector
+from models import AnalyzedTrendItem
+
+
+def _analyze_snapshot(path: str) -> Tuple[datetime, List[AnalyzedTrendItem]]:
+    """ワーカープロセスで1スナップショットを読み込み・分析する"""
+    fetched_at, raw_trends = raw_archive.load_raw_snapshot(path)
+    return fetched_at, analyzer.analyze_trends(raw_trends)
+
+
+def run_replay(
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    workers: int = config.REPLAY_MAX_WORKERS,
+    output_dir: str = config.REPLAY_OUTPUT_DIR
+) -> Dict[str, int]:
+    """
+    指定期間のスナップショットを再処理し、結果を output_dir に保存する。
+
+    Returns:
+        Dict[str, int]: 最終スナップショット時点のスコア（タイトル → スコア）
+    """
+    paths = list(raw_archive.iter_snapshot_paths(since, until))
+    if not paths:
+        print("[WARNING][replay] No raw snapshots found for the given range.")
+        return {}
+
+    print(f"[INFO][replay] Replaying {len(paths)} snapshots with {workers} workers...")
+    started = time.perf_counter()
+
+    burst_states: Dict[str, burst_detector.BurstState] = {}
+    final_scores: Dict[str, int] = {}
+    # 1ワーカーあたりの往復回数を抑えるため、ある程度まとめて渡す
+    chunksize = max(1, len(paths) // (workers * 4))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # mapは入力順（= 時系列順）で結果を返すため、そのまま逐次エンリッチできる
+        for fetched_at, analyzed_trends in executor.map(_analyze_snapshot, paths, chunksize=chunksize):
+            enriched_trends = enricher.enrich_trends(
+                analyzed_trends,
+                burst_states=burst_states,
+                observed_at=fetched_at,
+                persist=False
+            )
+            final_scores = {item.title: item.score for item in enriched_trends}
+            _save_replayed(output_dir, fetched_at, [item.to_dict() for item in enriched_trends])
+
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, 'scores.json'), 'w', encoding='utf-8') as f:
+        json.dump(final_scores, f, ensure_ascii=False, indent=2)
+
+    elapsed = time.perf_counter() - started
+    print(f"[INFO][replay] Replay complete. {len(paths)} snapshots in {elapsed:.1f}s "
+          f"({len(paths) / elapsed:.1f} snapshots/s). Output: {output_dir}")
+    return final_scores
+
+
+def _save_replayed(output_dir: str, fetched_at: datetime, data: List[Dict]) -> None:
+    """再処理結果を latest_trends.json と同じ形式で保存する"""
+    day_dir = os.path.join(output_dir, fetched_at.strftime('%Y%m%d'))
+    os.makedirs(day_dir, exist_ok=True)
+    path = os.path.join(day_dir, fetched_at.strftime('%H%M%S') + '.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"fetched_at": fetched_at.isoformat(), "trends": data},
+                  f, ensure_ascii=False, separators=(',', ':'))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay archived raw snapshots through analyzer and enricher.")
+    parser.add_argument('--since', help="start date YYYYMMDD (inclusive)")
+    parser.add_argument('--until', help="end date YYYYMMDD (inclusive)")
+    parser.add_argument('--workers', type=int, default=config.REPLAY_MAX_WORKERS)
+    parser.add_argument('--output-dir', default=config.REPLAY_OUTPUT_DIR)
+    args = parser.parse_args()
+
+    scores = run_replay(args.since, args.until, args.workers, args.output_dir)
+    if not scores:
+        sys.exit(1)
@@ -0,0 +1,193 @@
+# scripts/scheduler.py
+"""
+VIBRA適応スケジューラー
+一覧ページだけを先に取得してフィンガープリントを取り、
+前回から変化がなければ詳細取得・分析・キャッシュ書き込み・デプロイを省略する。
+実行間隔は一覧の順位・投稿数の変化量（チャーン率）に応じて
+SCHEDULER_MIN_INTERVAL_MINUTES 〜 SCHEDULER_MAX_INTERVAL_MINUTES の間で調整する。
+
+Usage:
+    # cronから最短間隔で起動する（期限前なら何もせず終了）
+    python scripts/scheduler.py --once
+    # 常駐して自前でスリープする
+    python scripts/scheduler.py --loop
+"""
+import os
+import sys
+import json
+import math
+import time
+import hashlib
+import argparse
+from datetime import datetime
+from typing import Dict, List, Tuple
+from zoneinfo import ZoneInfo
+
+import config
+import scraper
+import main
+import generator
+from models import RawTrendItem, TrendSource
+
+
+def run_cycle(force: bool = False) -> bool:
+    """
+    1サイクル実行する。
+
+    Args:
+        force: Trueの場合、次回実行予定時刻と変化判定を無視して処理する
+    Returns:
+        bool: 後段（分析・キャッシュ更新・デプロイ）を実行した場合True
+    """
+    state = _load_state()
+    now = datetime.now(ZoneInfo(config.TIMEZONE))
+
+    if not force and now.timestamp() < state.get("next_run_at", 0):
+        remaining = (state["next_run_at"] - now.timestamp()) / 60
+        print(f"[INFO][scheduler] Next run in {remaining:.1f} min. Skipping.")
+        return False
+
+    # 1. 一覧のみ取得（詳細ページは変化があったときだけ）
+    # 一覧の取得にもブラウザを起動するため、判定自体は軽くない。
+    # 変化があった場合は、そのブラウザを詳細取得でも使い回して起動を1回に抑える
+    sources = scraper.load_sources()
+    try:
+        return _check_and_run(state, now, sources, force)
+    finally:
+        scraper.close_sessions()
+
+
+def _check_and_run(state: Dict, now: datetime, sources: List[TrendSource], force: bool) -> bool:
+    """一覧を取得して変化を判定し、変化があれば詳細取得・分析まで行う"""
+    listing = scraper.fetch_trend_listing(sources)
+    if not listing:
+        print("[WARNING][scheduler] Empty listing. Retrying at the minimum interval.")
+        state["next_run_at"] = now.timestamp() + config.SCHEDULER_MIN_INTERVAL_MINUTES * 60
+        _save_state(state)
+        return False
+
+    # 2. 変化量から次回の間隔を決める
+    snapshot = _snapshot(listing)
+    churn = _measure_churn(state.get("snapshot", {}), snapshot)
+    smoothed = (config.SCHEDULER_CHURN_SMOOTHING * churn
+                + (1 - config.SCHEDULER_CHURN_SMOOTHING) * state.get("churn", churn))
+    interval = _interval_for(smoothed)
+
+    fingerprint = _fingerprint(listing)
+    changed = force or fingerprint != state.get("fingerprint")
+
+    state.update({
+        "fingerprint": fingerprint,
+        "snapshot": snapshot,
+        "churn": round(smoothed, 4),
+        "interval_minutes": round(interval, 1),
+        "last_checked_at": now.timestamp(),
+        "next_run_at": now.timestamp() + interval * 60,
+    })
+    print(f"[INFO][scheduler] churn={churn:.2f} (smoothed {smoothed:.2f}), "
+          f"next interval {interval:.1f} min, changed={changed}")
+
+    if not changed:
+        _save_state(state)
+        print("[INFO][scheduler] Listing unchanged. Skipping downstream stages.")
+        return False
+
+    # 3. 変化あり: 詳細取得 → 分析 → キャッシュ更新
+    raw_trend_items = scraper.fetch_trend_details(listing, sources)
+    # 分析中はブラウザが不要なので先に閉じる
+    scraper.close_sessions()
+    main.run_fetcher_pipeline(raw_trend_items, fetched_at=now)
+    # パイプラインが成功してから状態を確定させる（失敗時は次回も変化ありとして扱う）
+    _save_state(state)
+    return True
+
+
+def _fingerprint(listing: List[RawTrendItem]) -> str:
+    """
+    順位・タイトル・投稿数（対数で量子化）からフィンガープリントを作る。
+    投稿数のわずかな揺れでは変化ありにしない。
+    """
+    resolution = math.log1p(config.SCHEDULER_POSTS_RESOLUTION)
+    key = [(item.title, round(math.log1p(item.posts_num) / resolution)) for item in listing]
+    return hashlib.sha1(json.dumps(key, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def _snapshot(listing: List[RawTrendItem]) -> Dict[str, Tuple[int, int]]:
+    """タイトル → (順位, 投稿数)"""
+    return {item.title: (rank, item.posts_num) for rank, item in enumerate(listing)}
+
+
+def _measure_churn(previous: Dict[str, List[int]], current: Dict[str, Tuple[int, int]]) -> float:
+    """
+    前回との変化量を0〜1で返す。
+    新規・消滅したトレンドは1、継続トレンドは順位変動と投稿数の相対変化の大きい方。
+    """
+    if not previous:
+        return 1.0
+    titles = set(previous) | set(current)
+    total = 0.0
+    for title in titles:
+        if title not in previous or title not in current:
+            total += 1.0
+            continue
+        prev_rank, prev_posts = previous[title]
+        rank, posts = current[title]
+        rank_change = abs(rank - prev_rank) / max(len(current), 1)
+        posts_change = abs(posts - prev_posts) / max(prev_posts, 1)
+        total += min(1.0, max(rank_change, posts_change))
+    return total / len(titles)
+
+
+def _interval_for(churn: float) -> float:
+    """チャーン率から実行間隔（分）を線形に決める"""
+    ratio = min(1.0, churn / config.SCHEDULER_CHURN_FOR_MIN_INTERVAL)
+    return (config.SCHEDULER_MAX_INTERVAL_MINUTES
+            - (config.SCHEDULER_MAX_INTERVAL_MINUTES - config.SCHEDULER_MIN_INTERVAL_MINUTES) * ratio)
+
+
+def _load_state() -> Dict:
+    if not os.path.exists(config.SCHEDULER_STATE_PATH):
+        return {}
+    try:
+        with open(config.SCHEDULER_STATE_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except json.JSONDecodeError:
+        return {}
+
+
+def _save_state(state: Dict) -> None:
+    os.makedirs(os.path.dirname(config.SCHEDULER_STATE_PATH), exist_ok=True)
+    with open(config.SCHEDULER_STATE_PATH, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def _write_github_output(changed: bool) -> None:
+    """GitHub Actionsの後続ステップ（サイト生成・デプロイ）を分岐できるよう出力する"""
+    output_path = os.environ.get('GITHUB_OUTPUT')
+    if output_path:
+        with open(output_path, 'a', encoding='utf-8') as f:
+            f.write(f"changed={'true' if changed else 'false'}\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the VIBRA pipeline only when the trend listing changes.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--once', action='store_true', help="run a single cycle (default)")
+    mode.add_argument('--loop', action='store_true', help="run forever, sleeping for the adaptive interval")
+    parser.add_argument('--force', action='store_true', help="ignore the schedule and the change check")
+    args = parser.parse_args()
+
+    if not args.loop:
+        _write_github_output(run_cycle(force=args.force))
+        sys.exit(0)
+
+    while True:
+        try:
+            if run_cycle(force=args.force):
+                generator.generate_site_from_cache()
+        except SystemExit:
+            # パイプライン内のsys.exit（取得失敗など）でループを止めない
+            print("[WARNING][scheduler] Cycle aborted. Will retry.", file=sys.stderr)
+        args.force = False
+        next_run_at = _load_state().get("next_run_at", 0)
+        time.sleep(max(30.0, next_run_at - time.time()))
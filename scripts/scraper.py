@@ -1,10 +1,26 @@
 # scripts/scraper.py
 """
-VIBRAトレンドスクレイパー (Full Selenium版)
-一覧ページだけでなく詳細ページもSeleniumで取得することで、
-JavaScript生成コンテンツ（関連ポスト等）を確実に取得する。
+VIBRAトレンドスクレイパー (マルチソース版)
+config.TREND_SOURCES に定義された各ソースを並行に取得し、
+重複を統合した1本のRawTrendItemリストとして返す。
+
+- 各ソースはURL・セレクタ・取得バックエンド（Selenium / requests）を宣言する。
+- ソースごとの失敗・タイムアウトは他ソースに影響しない。
+- 全体の取得時間は各ソースの合計ではなく、最も遅いソース（上限付き）で決まる。
+  期限はバックエンド内で守る（URLの合間に確認し、ページごとの待ち時間も残り時間で打ち切る）ため、
+  通常は期限後にスレッドやブラウザが残らない。
+  期限を守らないバックエンド（ドライバ起動のハングなど）に備え、呼び出し側も期限 + 猶予で待ち打ち切る。
 """
+import re
 import time
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import lru_cache
+from dataclasses import replace
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
 from webdriver_manager.chrome import ChromeDriverManager
@@ -12,9 +28,8 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from bs4 import BeautifulSoup
-from typing import List
 import config
-from models import RawTrendItem
+from models import RawTrendItem, TrendSource
 from pydantic import BaseModel, ValidationError, HttpUrl
 
 # Pydanticモデルを使い、スクレイピングデータの型と構造を保証する
@@ -23,116 +38,350 @@ class ScrapedItem(BaseModel):
     posts_num: int
     detail_url: HttpUrl
 
-def fetch_raw_trends() -> List[RawTrendItem]:
+
+def load_sources() -> List[TrendSource]:
+    """config.TREND_SOURCES からソース定義を生成する"""
+    return [TrendSource(**definition) for definition in config.TREND_SOURCES]
+
+
+def fetch_raw_trends(sources: Optional[List[TrendSource]] = None) -> List[RawTrendItem]:
+    """
+    全ソースから一覧を取得・統合し、上位トレンドの関連ポストを付与して返す。
+    """
+    if sources is None:
+        sources = load_sources()
+
+    try:
+        listing = fetch_trend_listing(sources)
+        if not listing:
+            return []
+        return fetch_trend_details(listing, sources)
+    finally:
+        close_sessions()
+
+
+def fetch_trend_listing(sources: Optional[List[TrendSource]] = None) -> List[RawTrendItem]:
+    """
+    全ソースの一覧ページを並行に取得し、重複統合・順位付けしたリストを返す。
+    関連ポストはまだ含まない。
+    """
+    if sources is None:
+        sources = load_sources()
+
+    print(f"[INFO][scraper] Fetching listings from {len(sources)} sources...")
+    _prepare_backends(sources)
+    results = _run_per_source(_fetch_listing, [(source, (source,)) for source in sources])
+
+    merged = _merge_listings([(source, results[source.name]) for source in sources if source.name in results])
+    print(f"[INFO][scraper] Merged listing: {len(merged)} unique trends.")
+    return merged
+
+
+def fetch_trend_details(
+    listing: List[RawTrendItem],
+    sources: Optional[List[TrendSource]] = None
+) -> List[RawTrendItem]:
+    """
+    統合済みリストの上位 ANALYZE_TREND_COUNT 件について、
+    代表ソースの詳細ページから関連ポストを取得して付与する。
+    """
+    if sources is None:
+        sources = load_sources()
+    sources_by_name = {source.name: source for source in sources}
+
+    # 代表ソースごとに詳細URLをまとめ、ソース単位で並行取得する
+    urls_by_source: Dict[str, List[str]] = {}
+    for item in listing[:config.ANALYZE_TREND_COUNT]:
+        if item.source in sources_by_name:
+            urls_by_source.setdefault(item.source, []).append(item.detail_url)
+
+    print(f"[INFO][scraper] Fetching details for top {config.ANALYZE_TREND_COUNT} trends...")
+    _prepare_backends([sources_by_name[name] for name in urls_by_source])
+    results = _run_per_source(
+        _fetch_related_posts,
+        [(sources_by_name[name], (sources_by_name[name], urls)) for name, urls in urls_by_source.items()]
+    )
+
+    posts_by_url: Dict[str, List[str]] = {}
+    for posts in results.values():
+        posts_by_url.update(posts)
+
+    raw_trends = [
+        replace(item, related_posts=posts_by_url[item.detail_url]) if item.detail_url in posts_by_url else item
+        for item in listing
+    ]
+    print(f"[INFO][scraper] Successfully scraped {len(raw_trends)} trends with details.")
+    return raw_trends
+
+
+# ================================================
+# ソース単位の処理
+# ================================================
+
+def _fetch_listing(source: TrendSource, deadline: float) -> List[RawTrendItem]:
+    """1ソースの一覧ページを取得・解析する"""
+    pages = _get_backend(source)(source, [source.url], source.item_selector, deadline)
+    html = pages.get(source.url)
+    if not html:
+        return []
+
+    soup = BeautifulSoup(html, "html.parser")
+    trend_elements = soup.select(source.item_selector)
+    if not trend_elements:
+        print(f"[WARNING][scraper] {source.name}: No trend elements found. CSS selector might be outdated.")
+        return []
+
+    items: List[RawTrendItem] = []
+    for element in trend_elements:
+        try:
+            title = element.select_one(source.title_selector).text.strip()
+            posts_num_text = element.select_one(source.posts_count_selector).text
+            # "1,234件のポスト" などから数字のみを取り出す
+            posts_num = int(re.sub(r'[^\d]', '', posts_num_text) or 0)
+
+            raw_url = element.select_one(source.detail_url_selector)['href']
+            detail_url = f"{source.base_url}{raw_url}" if raw_url.startswith('/') else raw_url
+
+            items.append(RawTrendItem(
+                title=title,
+                posts_num=posts_num,
+                detail_url=detail_url,
+                source=source.name
+            ))
+        except Exception:
+            continue
+
+    print(f"[INFO][scraper] {source.name}: Found {len(items)} items.")
+    return items
+
+
+def _fetch_related_posts(source: TrendSource, urls: List[str], deadline: float) -> Dict[str, List[str]]:
+    """1ソースの詳細ページ群から関連ポスト本文を取得する"""
+    pages = _get_backend(source)(source, urls, source.post_text_selector, deadline)
+    posts_by_url: Dict[str, List[str]] = {}
+    for url, html in pages.items():
+        detail_soup = BeautifulSoup(html, "html.parser")
+        post_elements = detail_soup.select(source.post_text_selector)
+        posts_by_url[url] = [p.text.strip() for p in post_elements[:5]]
+    return posts_by_url
+
+
+def _run_per_source(
+    func: Callable,
+    jobs: List[Tuple[TrendSource, tuple]]
+) -> Dict[str, object]:
+    """
+    ソースごとのジョブを共通の期限付きで並行実行し、成功したものを返す。
+    失敗したソースはログを出して結果から除外する。
+    期限を過ぎたソースは、それまでに取得できたページだけを返す。
+
+    Args:
+        jobs: (ソース, funcへの引数タプル) のリスト。funcには最後の引数として期限が渡される
+    Returns:
+        Dict[str, object]: ソース名 → funcの戻り値
+    """
+    if not jobs:
+        return {}
+
+    deadline = time.monotonic() + config.SOURCE_FETCH_TIMEOUT_SECONDS
+    executor = ThreadPoolExecutor(max_workers=len(jobs))
+    futures = {executor.submit(func, *args, deadline): source for source, args in jobs}
+
+    # 通常はバックエンドが期限内に戻る。戻らないソースは猶予後に見切り、サイクルを止めない
+    done, not_done = wait(futures, timeout=config.SOURCE_FETCH_TIMEOUT_SECONDS + config.SOURCE_FETCH_GRACE_SECONDS)
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    results: Dict[str, object] = {}
+    for future in done:
+        source = futures[future]
+        try:
+            results[source.name] = future.result()
+        except Exception as e:
+            print(f"[WARNING][scraper] {source.name}: Fetch failed: {e}")
+    for future in not_done:
+        print(f"[WARNING][scraper] {futures[future].name}: Did not return within the deadline "
+              f"({config.SOURCE_FETCH_TIMEOUT_SECONDS}s + {config.SOURCE_FETCH_GRACE_SECONDS}s grace). "
+              f"Skipped this cycle.")
+    return results
+
+
+def _merge_listings(results: List[Tuple[TrendSource, List[RawTrendItem]]]) -> List[RawTrendItem]:
     """
-    SeleniumでJavaScriptレンダリング後のHTMLを取得し、
-    トレンドデータを抽出してRawTrendItemのリストを返す。
-    詳細ページもSeleniumで巡回する。
+    ソースごとの一覧を統合する。
+    - 正規化タイトルで重複を判定し、投稿数は合算する
+    - タイトル・詳細URL・代表ソースは優先度の高い（先に定義された）ソースを採用
+    - 順位はReciprocal Rank Fusionで統合する（単一ソースなら元の順位のまま）
     """
-    print("[INFO][scraper] Starting fetch_raw_trends with Full Selenium...")
-    
-    # --- Selenium WebDriverのセットアップ ---
+    merged: Dict[str, RawTrendItem] = {}
+    fusion_scores: Dict[str, float] = {}
+
+    for _, items in results:
+        for rank, item in enumerate(items):
+            key = _normalize_title(item.title)
+            if not key:
+                continue
+            fusion_scores[key] = fusion_scores.get(key, 0.0) + 1.0 / (config.SOURCE_MERGE_RRF_K + rank)
+            if key in merged:
+                existing = merged[key]
+                merged[key] = replace(existing, posts_num=existing.posts_num + item.posts_num)
+            else:
+                merged[key] = item
+
+    ordered_keys = sorted(merged, key=lambda k: (-fusion_scores[k], -merged[k].posts_num))
+    return [merged[key] for key in ordered_keys]
+
+
+def _normalize_title(title: str) -> str:
+    """重複判定用にタイトルを正規化する（全角半角・大小文字・空白の揺れを吸収）"""
+    return re.sub(r'\s+', '', unicodedata.normalize('NFKC', title)).lower()
+
+
+# ================================================
+# 取得バックエンド
+# 各バックエンドは (source, urls, wait_selector, deadline) を受け取り、URL → HTML を返す
+# deadline (time.monotonic() 基準) を過ぎたら残りのURLは取得せずに打ち切る
+# ================================================
+
+def _remaining_seconds(source: TrendSource, deadline: float, skipped: int) -> float:
+    """期限までの残り秒数を返す。期限切れの場合は打ち切るURL数をログに出して0を返す"""
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        print(f"[WARNING][scraper] {source.name}: Deadline of {config.SOURCE_FETCH_TIMEOUT_SECONDS}s reached. "
+              f"Skipped {skipped} remaining URLs this cycle.")
+        return 0.0
+    return remaining
+
+
+# ソース名 → 起動済みのブラウザ（一覧と詳細の取得で共有する）
+_drivers: Dict[str, webdriver.Chrome] = {}
+_drivers_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _chromedriver_path() -> str:
+    """ChromeDriverを用意する（プロセス内で1回だけ。ソースごとのジョブの期限の外で行う）"""
+    return ChromeDriverManager().install()
+
+
+def _prepare_backends(sources: List[TrendSource]) -> None:
+    """期限付きのジョブを始める前に、バックエンドの事前準備を済ませる"""
+    if any(source.backend == "selenium" for source in sources):
+        _chromedriver_path()
+
+
+def _fetch_pages_selenium(source: TrendSource, urls: List[str], wait_selector: str, deadline: float) -> Dict[str, str]:
+    """
+    SeleniumでJavaScriptレンダリング後のHTMLを取得する。
+    ブラウザはソースごとに1つ起動し、一覧と詳細の取得で使い回す（close_sessions()で終了）。
+    """
+    # 一覧ページは描画完了まで長めに、詳細ページは短めに待つ
+    wait_seconds = 20 if wait_selector == source.item_selector else 8
+
+    pages: Dict[str, str] = {}
+    # ブラウザ起動自体も重いので、期限切れなら起動しない
+    if not _remaining_seconds(source, deadline, len(urls)):
+        return pages
+    driver = _get_driver(source)
+
+    for i, url in enumerate(urls):
+        if i > 0:
+            # サーバー負荷軽減のため少し待つ
+            time.sleep(min(source.request_interval_seconds, max(0.0, deadline - time.monotonic())))
+        remaining = _remaining_seconds(source, deadline, len(urls) - i)
+        if not remaining:
+            # 読み込み途中の状態を次回に持ち越さないよう、期限切れのブラウザは閉じる
+            _close_driver(source.name)
+            break
+        try:
+            print(f"[INFO][scraper] {source.name}: Navigating to {url}...")
+            driver.set_page_load_timeout(min(config.REQUEST_TIMEOUT_SECONDS, remaining))
+            driver.get(url)
+            try:
+                WebDriverWait(driver, min(wait_seconds, max(0.0, deadline - time.monotonic()))).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, wait_selector))
+                )
+            except Exception:
+                # タイムアウトしてもHTMLは解析してみる
+                pass
+            pages[url] = driver.page_source
+        except Exception as e:
+            print(f"  [WARN] {source.name}: Failed to fetch {url}: {e}")
+    return pages
+
+
+def _get_driver(source: TrendSource) -> webdriver.Chrome:
+    """ソースのブラウザセッションを返す（未起動なら起動する）"""
+    with _drivers_lock:
+        driver = _drivers.get(source.name)
+    if driver is not None:
+        return driver
+
     options = webdriver.ChromeOptions()
     options.add_argument("--headless")  # ブラウザUIを表示しないヘッドレスモード
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
     options.add_argument(f'user-agent={config.REQUEST_HEADERS["User-Agent"]}')
-    
-    driver = None
-    raw_trends: List[RawTrendItem] = []
+    driver = webdriver.Chrome(service=ChromeService(_chromedriver_path()), options=options)
+    with _drivers_lock:
+        _drivers[source.name] = driver
+    return driver
 
-    try:
-        service = ChromeService(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
-        
-        # 1. 一覧ページ取得
-        print(f"[INFO][scraper] Navigating to List Page: {config.DATA_SOURCE_URL}...")
-        driver.get(config.DATA_SOURCE_URL)
-
-        print(f"[INFO][scraper] Waiting for selector '{config.TREND_SELECTORS[0]}'...")
-        WebDriverWait(driver, 20).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, config.TREND_SELECTORS[0]))
-        )
-        
-        # 一覧ページの解析
-        list_html = driver.page_source
-        soup = BeautifulSoup(list_html, "html.parser")
-        trend_elements = soup.select(config.TREND_SELECTORS[0])
-        
-        if not trend_elements:
-            print("[WARNING][scraper] No trend elements found. CSS selector might be outdated.")
-            return []
 
-        # 一時リスト作成（詳細URL取得のため）
-        temp_items = []
-        for element in trend_elements:
+def _close_driver(name: str) -> None:
+    with _drivers_lock:
+        driver = _drivers.pop(name, None)
+    if driver is not None:
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"  [WARN] {name}: Failed to close browser: {e}")
+
+
+def close_sessions() -> None:
+    """一覧・詳細の取得で使い回したブラウザをすべて終了する"""
+    with _drivers_lock:
+        names = list(_drivers)
+    for name in names:
+        _close_driver(name)
+
+
+def _fetch_pages_requests(source: TrendSource, urls: List[str], wait_selector: str, deadline: float) -> Dict[str, str]:
+    """requestsで静的HTMLを取得する（JSレンダリング不要なソース向け）"""
+    pages: Dict[str, str] = {}
+    with requests.Session() as session:
+        session.headers.update(config.REQUEST_HEADERS)
+        for i, url in enumerate(urls):
+            if i > 0:
+                time.sleep(min(source.request_interval_seconds, max(0.0, deadline - time.monotonic())))
+            remaining = _remaining_seconds(source, deadline, len(urls) - i)
+            if not remaining:
+                break
             try:
-                title = element.select_one(config.TITLE_SELECTOR).text.strip()
-                posts_num_text = element.select_one(config.POSTS_COUNT_SELECTOR).text
-                posts_num = int(posts_num_text.replace("件のポスト", "").replace(",", "").strip())
-                
-                raw_url = element.select_one(config.DETAIL_URL_SELECTOR)['href']
-                detail_url = f"https://search.yahoo.co.jp{raw_url}" if raw_url.startswith('/') else raw_url
-                
-                temp_items.append({
-                    "title": title,
-                    "posts_num": posts_num,
-                    "detail_url": detail_url
-                })
-            except Exception as e:
-                continue
+                response = session.get(url, timeout=min(config.REQUEST_TIMEOUT_SECONDS, remaining))
+                response.raise_for_status()
+                pages[url] = response.text
+            except requests.RequestException as e:
+                print(f"  [WARN] {source.name}: Failed to fetch {url}: {e}")
+    return pages
 
-        # 2. 詳細ページ巡回 (上位N件のみ)
-        print(f"[INFO][scraper] Found {len(temp_items)} items. Fetching details for top {config.ANALYZE_TREND_COUNT}...")
-        
-        for i, item in enumerate(temp_items):
-            related_posts = []
-            
-            # 上位件数のみ詳細取得
-            if i < config.ANALYZE_TREND_COUNT:
-                try:
-                    print(f"  [{i+1}/{config.ANALYZE_TREND_COUNT}] Visiting {item['title']}...")
-                    driver.get(item['detail_url'])
-                    
-                    # 投稿本文が表示されるまで待機 (少し短めのタイムアウトで)
-                    try:
-                        WebDriverWait(driver, 8).until(
-                            EC.presence_of_element_located((By.CSS_SELECTOR, config.POST_TEXT_SELECTOR))
-                        )
-                    except:
-                        # タイムアウトしてもHTMLは解析してみる
-                        pass
-                    
-                    detail_soup = BeautifulSoup(driver.page_source, "html.parser")
-                    post_elements = detail_soup.select(config.POST_TEXT_SELECTOR)
-                    related_posts = [p.text.strip() for p in post_elements[:5]]
-                    
-                except Exception as e:
-                    print(f"  [WARN] Failed to fetch details for {item['title']}: {e}")
-            
-            # RawTrendItem生成
-            raw_trends.append(RawTrendItem(
-                title=item['title'],
-                posts_num=item['posts_num'],
-                detail_url=item['detail_url'],
-                related_posts=related_posts
-            ))
-            
-            # サーバー負荷軽減のため少し待つ
-            time.sleep(1)
 
-    except Exception as e:
-        print(f"[CRITICAL][scraper] Selenium Error: {e}")
-    finally:
-        if driver:
-            driver.quit()
+FETCH_BACKENDS: Dict[str, Callable[[TrendSource, List[str], str, float], Dict[str, str]]] = {
+    "selenium": _fetch_pages_selenium,
+    "requests": _fetch_pages_requests,
+}
+
+
+def _get_backend(source: TrendSource) -> Callable[[TrendSource, List[str], str, float], Dict[str, str]]:
+    """ソースが宣言したバックエンドを返す"""
+    try:
+        return FETCH_BACKENDS[source.backend]
+    except KeyError:
+        raise ValueError(f"Unknown fetch backend '{source.backend}' for source '{source.name}'")
 
-    print(f"[INFO][scraper] Successfully scraped {len(raw_trends)} trends with details.")
-    return raw_trends
 
 if __name__ == '__main__':
     # Test run
     trends = fetch_raw_trends()
     for t in trends[:3]:
-        print(f"Title: {t.title}")
-        print(f"Related Posts: {len(t.related_posts)}")
\ No newline at end of file
+        print(f"Title: {t.title} ({t.source})")
+        print(f"Related Posts: {len(t.related_posts)}")
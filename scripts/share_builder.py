@@ -0,0 +1,119 @@
+# scripts/share_builder.py
+"""
+VIBRA 共有ページビルダー
+トレンドごとの共有ページ（og:title / og:image をトレンド単位で持つ）を生成し、
+一定期間保持する。
+
+共有URLはSNSに投稿された後も参照され続けるため、今回のスナップショットから
+外れたトレンドのページ・画像も保持期間内はリンク切れにしない。
+デプロイごとにdistは作り直されるため、cache側に保持する:
+  {SHARE_DIR}/manifest.json        slug → {"image": 画像パス, "updated": 最終更新時刻}
+  {SHARE_DIR}/site/share/XX.html   生成済みの共有ページ
+  {SHARE_DIR}/site/ogp/XX.png      共有ページ・トップページのOGP画像（ogp_rendererが配置）
+
+各サイクルで書き換えるのは今回のトレンドのページのみ。
+保持期間を過ぎたページと、どのページからも参照されなくなった画像はその際に削除する。
+"""
+import os
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from jinja2 import Environment
+
+import config
+
+
+def site_dir(share_dir: str = config.SHARE_DIR) -> str:
+    """配信用ファイルのルート（OGP画像の出力先としても使う）"""
+    return os.path.join(share_dir, 'site')
+
+
+def update_share_pages(
+    trends: List[Dict[str, Any]],
+    images: List[str],
+    site_image: str,
+    env: Environment,
+    now: datetime,
+    share_dir: str = config.SHARE_DIR,
+    **context
+) -> str:
+    """
+    今回のトレンドの共有ページを更新し、期限切れのページと画像を削除する。
+
+    Args:
+        trends: フロントエンド用トレンド（share_url を含む）
+        images: 各トレンドのOGP画像パス（site_dirからの相対パス。未生成なら空文字）
+        site_image: トップページのOGP画像パス（参照中のため削除しない）
+        context: 共有ページのテンプレートに渡す共通変数
+
+    Returns:
+        str: 配信用ファイルのルート（distへそのままコピーする）
+    """
+    root = site_dir(share_dir)
+    manifest_path = os.path.join(share_dir, 'manifest.json')
+    manifest: Dict[str, Dict[str, str]] = _load_json(manifest_path, {})
+
+    # 1. 今回のトレンドのページを生成
+    template = env.get_template('share.html')
+    for trend, image in zip(trends, images):
+        path = os.path.join(root, trend["share_url"])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(template.render(
+                trend=trend,
+                page_url=absolute_url(trend["share_url"]),
+                ogp_image_url=absolute_url(image),
+                **context
+            ))
+        slug = os.path.splitext(os.path.basename(trend["share_url"]))[0]
+        manifest[slug] = {"image": image, "updated": now.isoformat()}
+
+    # 2. 保持期間を過ぎたページを削除
+    expire_before = now - timedelta(days=config.SHARE_RETENTION_DAYS)
+    expired = [slug for slug, entry in manifest.items()
+               if datetime.fromisoformat(entry["updated"]) < expire_before]
+    for slug in expired:
+        _remove(os.path.join(root, 'share', f'{slug}.html'))
+        del manifest[slug]
+
+    # 3. どのページからも参照されなくなった画像を削除
+    referenced = {entry["image"] for entry in manifest.values()} | {site_image}
+    ogp_dir = os.path.join(root, 'ogp')
+    removed_images = 0
+    if os.path.isdir(ogp_dir):
+        for name in os.listdir(ogp_dir):
+            if f'ogp/{name}' not in referenced:
+                _remove(os.path.join(ogp_dir, name))
+                removed_images += 1
+
+    _write_json(manifest_path, manifest)
+    print(f"[INFO][share] Updated {len(trends)} share pages "
+          f"({len(manifest)} retained, {len(expired)} expired, {removed_images} images removed).")
+    return root
+
+
+def absolute_url(path: str) -> str:
+    """dist内の相対パスを公開URLにする（SITE_URL未設定・パスなしなら空文字）"""
+    return f"{config.SITE_URL}/{path}" if config.SITE_URL and path else ''
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _load_json(path: str, default):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return default
+
+
+def _write_json(path: str, data) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
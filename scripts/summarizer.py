@@ -0,0 +1,141 @@
+# scripts/summarizer.py
+"""
+VIBRA抽出型要約モジュール
+各トレンドの関連投稿から、TextRank（TF-IDF類似度グラフ上のPageRank）で
+中心的な文を選んで概要とする。
+
+- 形態素解析はanalyzerの結果（AnalyzedTrendItem.sentence_tokens）を再利用する。
+- 1回の実行に含まれる全トレンドの文をまとめて1つの疎行列にし、
+  類似度計算とPageRankの反復をトレンドをまたいで一括で行う
+  （類似度はトレンド内の文同士に限定するため、行列はブロック対角になる）。
+"""
+from typing import Dict, List
+
+import numpy as np
+from scipy import sparse
+
+import config
+from models import AnalyzedTrendItem
+
+
+def summarize_trends(trends: List[AnalyzedTrendItem]) -> List[str]:
+    """
+    全トレンドの概要をまとめて生成する。
+
+    Returns:
+        List[str]: trendsと同じ順序の概要（投稿がない場合は空文字）
+    """
+    summaries = [_fallback_summary(trend) for trend in trends]
+
+    # 1. 全トレンドの文を1つの行列に並べる（owner: 各行が属するトレンド番号）
+    owners: List[int] = []
+    rows: List[int] = []
+    cols: List[int] = []
+    vocabulary: Dict[str, int] = {}
+    for trend_index, trend in enumerate(trends):
+        for tokens in trend.sentence_tokens:
+            row = len(owners)
+            owners.append(trend_index)
+            for token in tokens:
+                rows.append(row)
+                cols.append(vocabulary.setdefault(token, len(vocabulary)))
+
+    if not owners or not vocabulary:
+        return summaries
+
+    scores = _textrank(
+        np.array(owners),
+        sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, cols)),
+            shape=(len(owners), len(vocabulary))
+        )
+    )
+
+    # 2. トレンドごとに上位の文を選び、元の順序で連結する
+    offset = 0
+    for trend_index, trend in enumerate(trends):
+        count = len(trend.sentence_tokens)
+        if count > 0:
+            summaries[trend_index] = _compose_summary(trend.sentences, scores[offset:offset + count])
+        offset += count
+
+    return summaries
+
+
+def _textrank(owners: np.ndarray, counts: sparse.csr_matrix) -> np.ndarray:
+    """
+    ブロック対角の文類似度グラフ上でPageRankを計算し、各文のスコアを返す。
+    スコアはトレンドごとに合計1になる。
+    """
+    n_sentences = counts.shape[0]
+
+    # TF-IDF（TFは対数スケール、IDFは実行内の全文を文書集合とする）
+    tfidf = counts.tocsr()
+    tfidf.sum_duplicates()
+    tfidf.data = np.log1p(tfidf.data)
+    document_frequency = np.bincount(tfidf.indices, minlength=tfidf.shape[1])
+    idf = np.log((1 + n_sentences) / (1 + document_frequency)) + 1
+    tfidf = tfidf @ sparse.diags(idf)
+
+    # 行のL2正規化 → 内積がコサイン類似度になる
+    norms = np.sqrt(np.asarray(tfidf.multiply(tfidf).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    tfidf = sparse.diags(1 / norms) @ tfidf
+
+    # 同じトレンド内の、異なる文同士の類似度だけを残す
+    similarity = (tfidf @ tfidf.T).tocoo()
+    keep = (owners[similarity.row] == owners[similarity.col]) & (similarity.row != similarity.col)
+    weights = sparse.csr_matrix(
+        (similarity.data[keep], (similarity.row[keep], similarity.col[keep])),
+        shape=(n_sentences, n_sentences)
+    )
+
+    # 遷移行列（行確率）。出次数0の文は自トレンド内へ一様にジャンプさせる
+    out_degree = np.asarray(weights.sum(axis=1)).ravel()
+    dangling = out_degree == 0
+    out_degree[dangling] = 1
+    transition_t = (sparse.diags(1 / out_degree) @ weights).T.tocsr()
+
+    group_sizes = np.bincount(owners)
+    teleport = 1.0 / group_sizes[owners]
+    damping = config.SUMMARY_DAMPING
+
+    rank = teleport.copy()
+    for _ in range(config.SUMMARY_MAX_ITERATIONS):
+        dangling_mass = np.bincount(owners, weights=rank * dangling, minlength=len(group_sizes))
+        updated = (1 - damping) * teleport + damping * (transition_t @ rank + dangling_mass[owners] * teleport)
+        if np.abs(updated - rank).sum() < 1e-6:
+            rank = updated
+            break
+        rank = updated
+    return rank
+
+
+def _compose_summary(sentences: List[str], scores: np.ndarray) -> str:
+    """スコア上位の文から、文数・文字数の上限に収まるだけ選んで元の順序で連結する"""
+    max_chars = config.SUMMARY_MAX_CHARS
+    ranked = np.argsort(-scores, kind='stable')
+
+    best = sentences[ranked[0]]
+    if len(best) > max_chars:
+        return best[:max_chars] + "..."
+
+    chosen = [ranked[0]]
+    length = len(best)
+    for index in ranked[1:config.SUMMARY_MAX_SENTENCES]:
+        if length + len(sentences[index]) <= max_chars:
+            chosen.append(index)
+            length += len(sentences[index])
+    # 句点で終わらない文（改行区切り）の後ろには空白を挟む
+    parts = [sentences[i] for i in sorted(chosen)]
+    return "".join(p if p[-1] in "。．！？!?" else p + " " for p in parts[:-1]) + parts[-1]
+
+
+def _fallback_summary(trend: AnalyzedTrendItem) -> str:
+    """形態素解析されていないトレンドは最初の関連投稿を切り詰めて使う"""
+    if not trend.related_posts:
+        return ""
+    summary = trend.related_posts[0]
+    if len(summary) > config.SUMMARY_MAX_CHARS:
+        summary = summary[:config.SUMMARY_MAX_CHARS] + "..."
+    return summary
@@ -0,0 +1,198 @@
+# scripts/term_tracker.py
+"""
+VIBRA急上昇ワードトラッカー
+analyzerが抽出した名詞（全トレンドのタイトル + 上位トレンドの関連投稿）を実行をまたいで集計し、
+Yahoo側でトピック化される前に複数トレンドで増えている語を見つける。
+
+- 時間バケット（TERM_TRACKER_BUCKET_MINUTES）ごとに、
+  Count-Min Sketch（近似頻度）とSpace-Saving（上位語リスト）を持つ。
+  語彙がいくら増えてもメモリは固定。
+- 頻度は「その語に言及したトレンド数」。実行回数で割った率で比較するため、
+  スケジューラーで実行間隔が変わっても偏らない。
+- 直近バケットの上位語について、過去バケットのSketchから求めた平常時の率と比べ、
+  伸び率の高い語を「急上昇ワード」とする。
+"""
+import os
+import json
+import zlib
+import base64
+import hashlib
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+import config
+from models import AnalyzedTrendItem
+
+
+class CountMinSketch:
+    """固定サイズの近似頻度表（過大評価のみ、過小評価なし）"""
+
+    def __init__(self, width: int, depth: int, table: Optional[np.ndarray] = None):
+        self.width = width
+        self.depth = depth
+        self.table = table if table is not None else np.zeros((depth, width), dtype=np.uint32)
+
+    def _indexes(self, terms: List[str]) -> np.ndarray:
+        """各語の行ごとの列番号 (depth, len(terms))。ダブルハッシュで行ごとのハッシュを作る"""
+        hashes = np.array(
+            [np.frombuffer(hashlib.blake2b(t.encode('utf-8'), digest_size=8).digest(), dtype=np.uint32)
+             for t in terms],
+            dtype=np.uint64
+        ).reshape(-1, 2)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        return ((hashes[:, 0][None, :] + rows * hashes[:, 1][None, :]) % self.width).astype(np.int64)
+
+    def add(self, terms: List[str]) -> None:
+        if not terms:
+            return
+        columns = self._indexes(terms)
+        rows = np.repeat(np.arange(self.depth), len(terms)).reshape(self.depth, -1)
+        np.add.at(self.table, (rows, columns), 1)
+
+    def estimate(self, terms: List[str]) -> np.ndarray:
+        if not terms:
+            return np.zeros(0, dtype=np.uint32)
+        columns = self._indexes(terms)
+        return self.table[np.arange(self.depth)[:, None], columns].min(axis=0)
+
+    def dump(self) -> str:
+        return base64.b64encode(zlib.compress(self.table.tobytes())).decode('ascii')
+
+    @classmethod
+    def load(cls, data: str, width: int, depth: int) -> 'CountMinSketch':
+        table = np.frombuffer(zlib.decompress(base64.b64decode(data)), dtype=np.uint32)
+        return cls(width, depth, table.reshape(depth, width).copy())
+
+
+class SpaceSaving:
+    """上位k語を固定容量で追跡する（Space-Savingアルゴリズム）"""
+
+    def __init__(self, capacity: int, counters: Optional[Dict[str, List[int]]] = None):
+        self.capacity = capacity
+        self.counters: Dict[str, List[int]] = counters or {}  # 語 → [count, error]
+
+    def add(self, term: str) -> None:
+        if term in self.counters:
+            self.counters[term][0] += 1
+        elif len(self.counters) < self.capacity:
+            self.counters[term] = [1, 0]
+        else:
+            # 最小カウントの語を置き換え、そのカウントを誤差として引き継ぐ
+            victim = min(self.counters, key=lambda t: self.counters[t][0])
+            floor = self.counters.pop(victim)[0]
+            self.counters[term] = [floor + 1, floor]
+
+    def top(self) -> List[str]:
+        return sorted(self.counters, key=lambda t: -self.counters[t][0])
+
+
+def track(
+    trends: List[AnalyzedTrendItem],
+    observed_at: datetime,
+    path: str = config.TERM_TRACKER_PATH
+) -> List[Dict]:
+    """
+    今回のトレンドの名詞を集計に加え、状態を保存して急上昇ワードを返す。
+
+    Returns:
+        List[Dict]: [{"word": 語, "count": 今バケットの言及トレンド数, "ratio": 平常時比}, ...]
+    """
+    buckets = _load_buckets(path)
+
+    # 現在のバケットを用意し、保持数を超えた古いバケットを捨てる
+    bucket_seconds = config.TERM_TRACKER_BUCKET_MINUTES * 60
+    start = int(observed_at.timestamp()) // bucket_seconds * bucket_seconds
+    if not buckets or buckets[-1]["start"] != start:
+        buckets.append(_new_bucket(start))
+    buckets = buckets[-config.TERM_TRACKER_BUCKETS:]
+    current = buckets[-1]
+
+    # 1トレンドにつき1語1回（= 何トレンドで言及されたか）
+    terms = [term for trend in trends for term in set(trend.nouns)]
+    current["cms"].add(terms)
+    for term in terms:
+        current["top"].add(term)
+    current["runs"] += 1
+
+    emerging = _emerging_terms(current, buckets[:-1])
+    _save_buckets(path, buckets)
+    print(f"[INFO][term_tracker] Tracked {len(terms)} term mentions. "
+          f"Emerging: {', '.join(e['word'] for e in emerging) or '-'}")
+    return emerging
+
+
+def _emerging_terms(current: Dict, history: List[Dict]) -> List[Dict]:
+    """現在バケットの上位語を、過去バケットの平常時の率と比べて並べる"""
+    # 比較対象の履歴がないうちは、すべての語が「急上昇」に見えるので出さない
+    history_runs = sum(b["runs"] for b in history)
+    candidates = [t for t in current["top"].top()
+                  if current["top"].counters[t][0] - current["top"].counters[t][1] >= config.TERM_TRACKER_MIN_COUNT]
+    if history_runs == 0 or not candidates:
+        return []
+
+    current_counts = current["cms"].estimate(candidates).astype(float)
+    current_rate = current_counts / current["runs"]
+    history_counts = np.sum([b["cms"].estimate(candidates) for b in history], axis=0).astype(float)
+    baseline_rate = history_counts / history_runs
+
+    smoothing = config.TERM_TRACKER_SMOOTHING
+    ratios = (current_rate + smoothing) / (baseline_rate + smoothing)
+
+    order = np.argsort(-ratios, kind='stable')
+    return [
+        {"word": candidates[i], "count": int(current_counts[i]), "ratio": round(float(ratios[i]), 2)}
+        for i in order
+        if ratios[i] >= config.TERM_TRACKER_MIN_RATIO
+    ][:config.TERM_TRACKER_TOP_N]
+
+
+def _new_bucket(start: int) -> Dict:
+    return {
+        "start": start,
+        "runs": 0,
+        "cms": CountMinSketch(config.TERM_TRACKER_SKETCH_WIDTH, config.TERM_TRACKER_SKETCH_DEPTH),
+        "top": SpaceSaving(config.TERM_TRACKER_HEAVY_HITTERS),
+    }
+
+
+def _load_buckets(path: str) -> List[Dict]:
+    """保存済みのバケットを読み込む（Sketchの寸法が設定と違う場合は捨てる）"""
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            raw = json.load(f)
+        if (raw["width"], raw["depth"]) != (config.TERM_TRACKER_SKETCH_WIDTH, config.TERM_TRACKER_SKETCH_DEPTH):
+            return []
+        return [
+            {
+                "start": b["start"],
+                "runs": b["runs"],
+                "cms": CountMinSketch.load(b["cms"], raw["width"], raw["depth"]),
+                "top": SpaceSaving(config.TERM_TRACKER_HEAVY_HITTERS, {t: [c, e] for t, c, e in b["top"]}),
+            }
+            for b in raw["buckets"]
+        ]
+    except (json.JSONDecodeError, KeyError, ValueError, zlib.error):
+        return []
+
+
+def _save_buckets(path: str, buckets: List[Dict]) -> None:
+    raw = {
+        "width": config.TERM_TRACKER_SKETCH_WIDTH,
+        "depth": config.TERM_TRACKER_SKETCH_DEPTH,
+        "buckets": [
+            {
+                "start": b["start"],
+                "runs": b["runs"],
+                "cms": b["cms"].dump(),
+                "top": [[t, c, e] for t, (c, e) in b["top"].counters.items()],
+            }
+            for b in buckets
+        ],
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(raw, f, ensure_ascii=False, separators=(',', ':'))
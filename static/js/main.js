@@ -2,54 +2,129 @@
  * VIBRA - Living Cloud Visualization
  * Refactored: Vanilla JS + Phyllotaxis Layout (No D3)
  * Provides stable, deterministic positioning with organic "cloud" aesthetics.
+ * Layout is precomputed per genre/viewport by the generator (trend.layout);
+ * the client only positions nodes and toggles their visibility.
  */
 
 class VIBRAApp {
     constructor() {
         this.trends = [];
+        this.trendIds = new Set();
+        this.viewports = {};
+        this.nodes = new Map();
+        this.version = null;
+        this.fullyLoaded = false;
+        this.loadedShards = new Set();
         this.currentGenre = 'all';
         this.container = document.getElementById('visualization');
         this.tooltip = null;
-        this.width = 0;
-        this.height = 0;
         this.init();
     }
 
     async init() {
         this.tooltip = this.createTooltip();
-        await this.loadTrends();
+
+        // First paint from the payload inlined into index.html (no network round trip)
+        const initial = this.readInitialData();
+        if (initial) {
+            this.applyData(initial);
+            this.fullyLoaded = Boolean(initial.complete);
+        } else {
+            await this.loadTrends();
+        }
+
         this.setupEventListeners();
         this.updateTimeDisplay();
         this.renderVisualization();
 
+        // Full dataset is fetched after the first bubbles are on screen
+        if (!this.fullyLoaded) {
+            requestAnimationFrame(() => setTimeout(() => this.loadTrends(), 0));
+        }
+
         // Update time every minute
         setInterval(() => this.updateTimeDisplay(), 60000);
     }
 
-    async loadTrends() {
+    readInitialData() {
+        const el = document.getElementById('initial-data');
+        if (!el) return null;
         try {
-            // Cache busting for data
-            const response = await fetch(`trends.json?v=${new Date().getTime()}`);
-            if (!response.ok) throw new Error('Failed to load trends');
-            const data = await response.json();
-            this.trends = data.trends || [];
-
-            // Update timestamp if available
-            if (data.last_updated) {
-                const timeDisplay = document.querySelector('.time-display');
-                if (timeDisplay) timeDisplay.textContent = data.last_updated;
-            }
+            return JSON.parse(el.textContent);
+        } catch (error) {
+            console.error('Error parsing initial data:', error);
+            return null;
+        }
+    }
 
+    applyData(data) {
+        let added = 0;
+        (data.trends || []).forEach(trend => {
+            if (this.trendIds.has(trend.id)) return;
+            this.trendIds.add(trend.id);
+            this.trends.push(trend);
+            added++;
+        });
+        if (data.viewports) this.viewports = data.viewports;
+        if (data.version) this.version = data.version;
+
+        // Update timestamp if available
+        if (data.last_updated) {
+            const timeDisplay = document.querySelector('.time-display');
+            if (timeDisplay) timeDisplay.textContent = data.last_updated;
+        }
+        if (data.emerging_words) this.renderEmergingWords(data.emerging_words);
+        return added;
+    }
+
+    renderEmergingWords(words) {
+        const container = document.querySelector('.emerging-words');
+        const list = container && container.querySelector('.emerging-list');
+        if (!list) return;
+        list.innerHTML = '';
+        words.forEach(({ word, ratio }) => {
+            const li = document.createElement('li');
+            li.textContent = word;
+            li.title = `平常時の${ratio}倍`;
+            list.appendChild(li);
+        });
+        container.hidden = words.length === 0;
+    }
+
+    async fetchData(path) {
+        // Version is fixed per deploy, so the browser cache stays valid between deploys
+        const response = await fetch(`${path}?v=${this.version || new Date().getTime()}`);
+        if (!response.ok) throw new Error(`Failed to load ${path}`);
+        return response.json();
+    }
+
+    async loadTrends() {
+        try {
+            const added = this.applyData(await this.fetchData('trends.json'));
+            this.fullyLoaded = true;
             console.log(`Loaded ${this.trends.length} trends`);
+            if (added > 0 && this.nodes.size > 0) this.renderVisualization();
         } catch (error) {
             console.error('Error loading trends:', error);
-            this.trends = [];
-            if (this.container) {
+            if (this.container && this.trends.length === 0) {
                 this.container.innerHTML = '<p class="no-data">トレンドの読み込みに失敗しました</p>';
             }
         }
     }
 
+    async loadShard(genre) {
+        // Only needed when a tab is opened before the full dataset has arrived
+        if (this.fullyLoaded || genre === 'all' || this.loadedShards.has(genre)) return;
+        this.loadedShards.add(genre);
+        try {
+            const added = this.applyData(await this.fetchData(`data/trends-${genre}.json`));
+            if (added > 0 && genre === this.currentGenre) this.renderVisualization();
+        } catch (error) {
+            // No shard means the genre has no trends; the full dataset will still arrive
+            console.warn(`No data shard for ${genre}:`, error);
+        }
+    }
+
     setupEventListeners() {
         document.querySelectorAll('.tab').forEach(tab => {
             tab.addEventListener('click', (e) => {
@@ -57,6 +132,7 @@ class VIBRAApp {
                 e.target.classList.add('active');
                 this.currentGenre = e.target.dataset.genre;
                 this.renderVisualization();
+                this.loadShard(this.currentGenre);
             });
         });
 
@@ -78,13 +154,6 @@ class VIBRAApp {
         }
     }
 
-    getFilteredTrends() {
-        if (this.currentGenre === 'all') {
-            return this.trends;
-        }
-        return this.trends.filter(trend => trend.category === this.currentGenre);
-    }
-
     getHeatColor(heatLevel) {
         const colors = {
             high: ['#EF4444', '#F97316', '#F59E0B'],    // Red-Orange
@@ -95,55 +164,73 @@ class VIBRAApp {
         return palette[Math.floor(Math.random() * palette.length)];
     }
 
-    renderVisualization() {
-        if (!this.container) return;
-        this.container.innerHTML = ''; // Clear previous
-
-        // Prevent 0 dimension issues
-        this.width = this.container.clientWidth || window.innerWidth;
-        this.height = this.container.clientHeight || (window.innerHeight - 100);
-        if (this.width === 0) this.width = 800;
-        if (this.height === 0) this.height = 600;
-
-        const filteredTrends = this.getFilteredTrends();
-        if (filteredTrends.length === 0) {
-            this.container.innerHTML = '<p class="no-data">表示するトレンドがありません</p>';
-            return;
+    /**
+     * Pick the viewport class whose max_width fits the container.
+     * Breakpoints come from trends.json (smallest first, null = unbounded).
+     */
+    getViewport() {
+        const width = this.container.clientWidth || window.innerWidth || 800;
+        const entries = Object.entries(this.viewports);
+        for (const [name, maxWidth] of entries) {
+            if (maxWidth === null || width <= maxWidth) return name;
         }
+        return entries.length > 0 ? entries[entries.length - 1][0] : 'desktop';
+    }
 
-        // Algo: Sort by score descending (Highest score in center)
-        filteredTrends.sort((a, b) => b.score - a.score);
+    renderVisualization() {
+        if (!this.container) return;
 
-        const centerX = this.width / 2;
-        const centerY = this.height / 2;
+        // Nodes are built once per trend; genre/viewport changes only move or hide them
+        this.trends.forEach(trend => {
+            if (this.nodes.has(trend.id)) return;
+            const item = this.createBubbleElement(trend);
+            this.nodes.set(trend.id, { item, trend, viewport: null });
+            this.container.appendChild(item);
+        });
 
-        // Spacing constant: Determines how spread out the cloud is
-        // Adjust this if bubbles overlap too much or are too sparse
-        const spacing = 55;
+        const viewport = this.getViewport();
 
-        filteredTrends.forEach((trend, i) => {
-            // Phyllotaxis Formula
-            // theta = index * 137.5 degrees (Golden Angle)
-            // r = c * sqrt(index)
-            const angle = i * 137.508 * (Math.PI / 180);
-            const radius = spacing * Math.sqrt(i);
+        // Positions are precomputed by the generator as offsets from the center
+        let visible = 0;
+        this.nodes.forEach(node => {
+            const { item, trend } = node;
+            const pos = trend.layout && trend.layout[viewport] && trend.layout[viewport][this.currentGenre];
+            if (!pos) {
+                item.style.display = 'none';
+                return;
+            }
+            const [x, y, r] = pos;
+            item.style.left = `calc(50% + ${x}px)`;
+            item.style.top = `calc(50% + ${y}px)`;
+            if (node.viewport !== viewport) {
+                this.sizeBubble(item, trend, r * 2);
+                node.viewport = viewport;
+            }
+            item.style.display = '';
+            visible++;
+        });
 
-            const x = centerX + radius * Math.cos(angle);
-            const y = centerY + radius * Math.sin(angle);
+        this.toggleNoData(visible === 0);
+    }
 
-            this.createBubbleElement(trend, x, y);
-        });
+    toggleNoData(show) {
+        let message = this.container.querySelector('.no-data');
+        if (show && !message) {
+            message = document.createElement('p');
+            message.className = 'no-data';
+            message.textContent = '表示するトレンドがありません';
+            this.container.appendChild(message);
+        }
+        if (message) message.style.display = show ? '' : 'none';
     }
 
-    createBubbleElement(trend, x, y) {
-        const size = this.calculateSize(trend.score);
+    createBubbleElement(trend) {
         const color = this.getHeatColor(trend.heatLevel);
 
         // 1. Container Item (Position)
         const item = document.createElement('div');
         item.className = `trend-item stage-${trend.stage}`;
-        item.style.left = `${x}px`;
-        item.style.top = `${y}px`;
+        item.style.display = 'none';
 
         // 2. Floater (Animation)
         const floater = document.createElement('div');
@@ -154,18 +241,15 @@ class VIBRAApp {
         // 3. Bubble (Visuals)
         const bubble = document.createElement('div');
         bubble.className = 'trend-bubble';
-        bubble.style.width = `${size}px`;
-        bubble.style.height = `${size}px`;
         bubble.style.background = color;
 
         // Text
         const textSpan = document.createElement('span');
-        textSpan.textContent = this.truncateText(trend.text, size);
-        textSpan.style.fontSize = `${Math.max(11, size / 4.5)}px`; // Dynamic font sizing
 
         // Assemble
         bubble.appendChild(textSpan);
         floater.appendChild(bubble);
+        if (trend.share_url) floater.appendChild(this.createShareButton(trend));
         item.appendChild(floater);
 
         // Interactions
@@ -176,14 +260,34 @@ class VIBRAApp {
             if (trend.detail_url) window.open(trend.detail_url, '_blank');
         });
 
-        this.container.appendChild(item);
+        return item;
     }
 
-    calculateSize(score) {
-        // Output Diameter
-        const minD = 60;
-        const maxD = 130;
-        return minD + (score / 100) * (maxD - minD);
+    createShareButton(trend) {
+        // Share page carries the per-trend og:image, so its URL unfurls with a preview when shared
+        const button = document.createElement('button');
+        button.type = 'button';
+        button.className = 'trend-share';
+        button.textContent = '共有';
+        button.setAttribute('aria-label', `「${trend.text}」を共有`);
+        button.addEventListener('click', (e) => {
+            e.stopPropagation(); // Keep the bubble click (detail page) from firing
+            if (navigator.share) {
+                navigator.share({ title: trend.text, url: trend.share_url }).catch(() => {});
+            } else {
+                window.open(trend.share_url, '_blank');
+            }
+        });
+        return button;
+    }
+
+    sizeBubble(item, trend, size) {
+        const bubble = item.querySelector('.trend-bubble');
+        const textSpan = bubble.firstChild;
+        bubble.style.width = `${size}px`;
+        bubble.style.height = `${size}px`;
+        textSpan.textContent = this.truncateText(trend.text, size);
+        textSpan.style.fontSize = `${Math.max(11, size / 4.5)}px`; // Dynamic font sizing
     }
 
     truncateText(text, diameter) {
@@ -218,6 +322,7 @@ class VIBRAApp {
             <div class="tt-meta">
                 <span class="badg">${d.heatLevel ? d.heatLevel.toUpperCase() : 'N/A'}</span>
                 <span>Score: ${d.score}</span>
+                ${d.burst_state === 'burst' ? `<span>急上昇 +${d.burst_strength}σ</span>` : ''}
             </div>
             <div class="tt-related">関連: ${d.related_words && d.related_words.length > 0 ? d.related_words.join(', ') : '-'}</div>
         `;
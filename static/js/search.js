@@ -0,0 +1,160 @@
+/**
+ * VIBRA - Archive Search
+ * Client side of the static character-bigram index built by scripts/archive_builder.py.
+ * The index is partitioned by month; months are searched newest first and only the shards
+ * for the query's bigrams (and the matching days' doc files) are fetched, stopping once
+ * enough results are found. Shard URLs carry the month's version so browsers can cache them.
+ * Normalization, bigram and shard hashing must match the Python side.
+ */
+
+class ArchiveSearch {
+    constructor() {
+        this.base = '../search/';
+        this.meta = null;
+        this.metaRequest = null;
+        this.shards = new Map();  // 'YYYY-MM/shard' -> Promise<{bigram: [docId]}>
+        this.docs = new Map();    // day -> Promise<[[title, summary, words, hours]]>
+        this.form = document.getElementById('search-form');
+        this.input = document.getElementById('search-input');
+        this.results = document.getElementById('search-results');
+        this.maxResults = 50;
+        this.seq = 0;  // ignore results of superseded queries
+        // Build version stamped into the page, so a new deploy never reads a cached meta.json
+        this.version = this.form ? this.form.dataset.version : '';
+        this.init();
+    }
+
+    init() {
+        if (!this.form) return;
+        let timeout;
+        this.input.addEventListener('input', () => {
+            clearTimeout(timeout);
+            timeout = setTimeout(() => this.search(this.input.value), 250);
+        });
+        this.form.addEventListener('submit', (e) => {
+            e.preventDefault();
+            this.search(this.input.value);
+        });
+    }
+
+    normalize(text) {
+        return String(text || '').normalize('NFKC').toLowerCase();
+    }
+
+    bigrams(text) {
+        const grams = new Set();
+        const segments = this.normalize(text).match(/[\p{L}\p{N}_]+/gu) || [];
+        segments.forEach(segment => {
+            const chars = Array.from(segment);
+            if (chars.length === 1) {
+                grams.add(chars[0]);
+                return;
+            }
+            for (let i = 0; i < chars.length - 1; i++) grams.add(chars[i] + chars[i + 1]);
+        });
+        return grams;
+    }
+
+    shardName(gram) {
+        // FNV-1a (32bit) over UTF-16 code units
+        let h = 0x811c9dc5;
+        for (let i = 0; i < gram.length; i++) {
+            h ^= gram.charCodeAt(i);
+            h = Math.imul(h, 0x01000193) >>> 0;
+        }
+        return (h % this.meta.shards).toString(16).padStart(2, '0');
+    }
+
+    fetchJSON(cache, key, path) {
+        if (!cache.has(key)) {
+            cache.set(key, fetch(this.base + path).then(r => (r.ok ? r.json() : {})).catch(() => ({})));
+        }
+        return cache.get(key);
+    }
+
+    loadMeta() {
+        if (!this.metaRequest) {
+            this.metaRequest = fetch(`${this.base}meta.json?v=${this.version || Date.now()}`).then(r => r.json());
+        }
+        return this.metaRequest;
+    }
+
+    async search(query) {
+        const seq = ++this.seq;
+        const grams = Array.from(this.bigrams(query));
+        if (grams.length === 0 || this.normalize(query).trim().length < 2) {
+            this.results.innerHTML = '';
+            return;
+        }
+        const meta = this.meta = await this.loadMeta();
+        const months = Object.keys(meta.months || {}).sort().reverse();
+        const needles = this.normalize(query).split(/\s+/).filter(Boolean);
+        const hits = [];
+
+        for (const month of months) {
+            if (hits.length >= this.maxResults) break;
+            const v = meta.months[month];
+
+            // 1. Intersect the posting lists of every query bigram within this month
+            const postings = await Promise.all(grams.map(async gram => {
+                const shard = this.shardName(gram);
+                const index = await this.fetchJSON(this.shards, `${month}/${shard}`, `index/${month}/${shard}.json?v=${v}`);
+                return index[gram] || [];
+            }));
+            if (seq !== this.seq) return;
+            postings.sort((a, b) => a.length - b.length);
+            let candidates = new Set(postings[0]);
+            postings.slice(1).forEach(list => {
+                const next = new Set(list);
+                candidates = new Set([...candidates].filter(id => next.has(id)));
+            });
+
+            // 2. Verify with a substring match (bigrams alone can give false positives), newest first
+            const ids = [...candidates].sort().reverse();
+            for (const id of ids) {
+                if (hits.length >= this.maxResults) break;
+                const [day, index] = id.split(':');
+                const docs = await this.fetchJSON(this.docs, day, `docs/${day}.json?v=${v}`);
+                const doc = docs[Number(index)];
+                if (!doc) continue;
+                const haystack = this.normalize([doc[0], doc[1], ...(doc[2] || [])].join(' '));
+                if (needles.every(n => haystack.includes(n))) hits.push({ day, doc });
+            }
+        }
+        if (seq === this.seq) this.render(hits);
+    }
+
+    render(hits) {
+        this.results.innerHTML = '';
+        if (hits.length === 0) {
+            const li = document.createElement('li');
+            li.className = 'meta';
+            li.textContent = '見つかりませんでした';
+            this.results.appendChild(li);
+            return;
+        }
+        hits.forEach(({ day, doc }) => {
+            const [title, summary, , hours] = doc;
+            const li = document.createElement('li');
+            const link = document.createElement('a');
+            link.href = `${day}/index.html`;
+            link.textContent = title;
+            const meta = document.createElement('div');
+            meta.className = 'meta';
+            meta.textContent = `${day} ${(hours || []).map(h => `${h}時`).join(' ')}`;
+            li.appendChild(link);
+            if (summary) {
+                const body = document.createElement('div');
+                body.className = 'summary';
+                body.textContent = summary;
+                li.appendChild(body);
+            }
+            li.appendChild(meta);
+            this.results.appendChild(li);
+        });
+    }
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+    window.archiveSearch = new ArchiveSearch();
+});